@@ -4,6 +4,8 @@ Automation pipeline package.
 
 from .config import config, Config
 from .workflow_loader import WorkflowLoader
+from .event_table import EventTable
+from .workflow_filter import WorkflowFilter
 from .llm_client import LLMClient
 from .automation_runner import AutomationRunner
 from .chat import start_chat
@@ -12,6 +14,8 @@ __all__ = [
     "config",
     "Config", 
     "WorkflowLoader",
+    "EventTable",
+    "WorkflowFilter",
     "LLMClient",
     "AutomationRunner",
     "start_chat",
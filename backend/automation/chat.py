@@ -294,12 +294,12 @@ def _cmd_key(args: str):
 
 async def _cmd_load(args: str):
     """Load a CSV workflow, generate task description, offer to run."""
-    from .workflow_loader import WorkflowLoader
+    from .workflow_loader import loader_for
     from .llm_client import LLMClient
 
     parts = args.strip().split()
     if not parts:
-        print("  Usage: /load <path-to-csv> [--id <workflow_id>]")
+        print("  Usage: /load <path-to-csv-or-ndjson> [--id <workflow_id>]")
         return
 
     csv_path = Path(parts[0]).expanduser()
@@ -315,12 +315,17 @@ async def _cmd_load(args: str):
 
     print(f"  Loading workflow from: {csv_path}")
     try:
-        loader = WorkflowLoader(csv_path)
+        loader = loader_for(csv_path)
         workflow = loader.load_single(workflow_id)
     except Exception as e:
         print(f"  Error: Failed to load workflow: {e}")
         return
 
+    if config.noise_reduction:
+        from .noise_reduction import noise_reducer
+        workflow, report = noise_reducer.reduce_workflow(workflow)
+        print(f"  Noise reduction: {report}")
+
     print(f"  Workflow: {workflow.workflow_id} ({len(workflow.events)} events)")
     print(f"  Start URL: {workflow.start_url}")
 
@@ -328,7 +333,7 @@ async def _cmd_load(args: str):
     try:
         config.validate()
         llm_client = LLMClient()
-        task_description = llm_client.generate_task_description(workflow)
+        task_description = llm_client.generate_segmented_description(workflow)
     except Exception as e:
         print(f"  Error: LLM generation failed: {e}")
         return
@@ -0,0 +1,61 @@
+"""
+Compressed module.
+Transparent reading of gzip- and zstd-compressed exports.
+
+Archived exports are detected by their magic bytes (not their file name) and
+decompressed while they are read, so the parsers consume them as ordinary
+streams without a temporary copy on disk.
+"""
+
+import gzip
+import io
+from pathlib import Path
+from typing import BinaryIO, Optional, TextIO, cast
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """Return "gzip" or "zstd" for a compressed file, None for plain text."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if magic == _ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def open_binary(path: Path, compression: Optional[str] = None) -> BinaryIO:
+    """Open a file for reading bytes, decompressing on the fly if needed."""
+    if compression == "gzip":
+        # GzipFile is a binary file object, just not a BinaryIO subclass
+        return cast(BinaryIO, gzip.open(path, "rb"))
+    if compression == "zstd":
+        return _open_zstd(path)
+    return open(path, "rb")
+
+
+def open_text(path: Path, compression: Optional[str] = None) -> TextIO:
+    """Open a file for reading UTF-8 text, decompressing on the fly if needed."""
+    if compression is None:
+        return open(path, "r", encoding="utf-8")
+    return io.TextIOWrapper(open_binary(path, compression), encoding="utf-8")
+
+
+def _open_zstd(path: Path) -> BinaryIO:
+    try:
+        # Python 3.14+
+        from compression import zstd  # pyright: ignore[reportMissingImports]
+        return zstd.open(path, "rb")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            f"{path.name} is zstd-compressed. Install the 'zstandard' package to read it."
+        ) from None
+    reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+    return io.BufferedReader(reader)
@@ -24,6 +24,19 @@ class Config:
     # Browser-use settings
     headless: bool = field(default_factory=lambda: os.getenv("HEADLESS", "false").lower() == "true")
     
+    # Drop scroll bursts, duplicate focus/clicks and non-interactive events before prompting
+    noise_reduction: bool = field(default_factory=lambda: os.getenv("NOISE_REDUCTION", "true").lower() == "true")
+    
+    # Cache LLM responses in memory and in a SQLite file (empty path keeps them in memory only)
+    response_cache: bool = field(default_factory=lambda: os.getenv("RESPONSE_CACHE", "true").lower() == "true")
+    response_cache_path: str = field(default_factory=lambda: os.getenv(
+        "RESPONSE_CACHE_PATH", str(Path.home() / ".cache" / "autopattern" / "responses.sqlite3")
+    ))
+    response_cache_ttl: int = field(default_factory=lambda: int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600))))
+    
+    # Group concurrent /api/describe calls into shared LLM requests
+    describe_batching: bool = field(default_factory=lambda: os.getenv("DESCRIBE_BATCHING", "false").lower() == "true")
+    
     # Paths
     project_root: Path = field(default_factory=lambda: Path(__file__).parent.parent.parent)
     
@@ -0,0 +1,159 @@
+"""
+CSV Engines module.
+Pluggable tokenizers that turn a whole CSV export into rows of strings.
+
+The stdlib engine streams rows through csv.reader and is always available.
+The pyarrow and polars engines parse every column in native code and hand
+back plain string columns, which WorkflowLoader zips into rows for the same
+row mapper. Both are optional; "auto" uses pyarrow when it is installed and
+otherwise falls back to the stdlib. Polars has to be asked for by name (see
+_read_polars for why).
+
+Native engines are strict about the row width. A file with ragged rows
+(e.g. an unquoted comma in a title) raises EngineError, and the loader
+re-parses it with the stdlib engine, which tolerates them.
+"""
+
+import csv
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .compressed import open_binary, open_text
+
+ENGINES = ("stdlib", "pyarrow", "polars")
+
+# Line breaks inside quoted values, translated to "\n" like the stdlib's text mode does
+_NEWLINE_PATTERN = r"\r\n?"
+
+# Preference order for engine="auto"; only engines whose rows match the stdlib's
+_AUTO_ORDER = ("pyarrow",)
+
+
+class EngineError(Exception):
+    """Raised when a native engine cannot parse a file the way the stdlib would."""
+
+
+def available_engines() -> list[str]:
+    """List the engines that can be used in this environment."""
+    return ["stdlib"] + [name for name in ENGINES[1:] if find_spec(name) is not None]
+
+
+def resolve_engine(engine: str) -> str:
+    """Map an engine name (or "auto") to an installed engine."""
+    if engine == "auto":
+        for name in _AUTO_ORDER:
+            if find_spec(name) is not None:
+                return name
+        return "stdlib"
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}'. Choose from: auto, {', '.join(ENGINES)}")
+    if engine != "stdlib" and find_spec(engine) is None:
+        print(f"CSV engine '{engine}' is not installed, using the stdlib parser")
+        return "stdlib"
+    return engine
+
+
+def read_header(path: Path, compression: Optional[str] = None) -> list[str]:
+    """Read just the header record of a CSV file."""
+    with open_text(path, compression) as f:
+        return next(csv.reader(f), [])
+
+
+def read_rows(path: Path, engine: str, compression: Optional[str] = None) -> tuple[list[str], Iterator[tuple]]:
+    """Parse a whole CSV file with a native engine.
+
+    Returns the header and an iterator of full-width rows of strings
+    (missing values are empty strings, as with csv.reader). Compressed
+    files are streamed through the decompressor into the engine.
+    """
+    if engine not in ENGINES[1:]:
+        raise ValueError(f"'{engine}' is not a native CSV engine")
+    reader = _read_pyarrow if engine == "pyarrow" else _read_polars
+    try:
+        return reader(path, compression)
+    except EngineError:
+        raise
+    except Exception as e:
+        # An incompatible engine version (e.g. a renamed keyword) must not
+        # break load(); the stdlib parser can still read the file
+        raise EngineError(f"{type(e).__name__}: {e}") from e
+
+
+def _read_pyarrow(path: Path, compression: Optional[str]) -> tuple[list[str], Iterator[tuple]]:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    header = read_header(path, compression)
+    if not header:
+        return header, iter(())
+    try:
+        with open_binary(path, compression) as source:
+            table = pa_csv.read_csv(
+                source,
+                read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+                # Link text and selectors can span several lines inside quotes
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                # Keep every column as text; the row mapper does its own conversions
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in header},
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise EngineError(str(e)) from e
+
+    columns = [_universal_newlines_arrow(column).to_pylist() for column in table.columns]
+    return header, zip(*columns)
+
+
+def _universal_newlines_arrow(column):
+    """Translate CRLF and CR inside values to LF, as reading the file in text mode does."""
+    # The compute functions are generated at import time, so type stubs lack them
+    import pyarrow.compute as pc
+
+    if not pc.any(pc.match_substring(column, "\r")).as_py():  # pyright: ignore[reportAttributeAccessIssue]
+        return column
+    return pc.replace_substring_regex(  # pyright: ignore[reportAttributeAccessIssue]
+        column, pattern=_NEWLINE_PATTERN, replacement="\n"
+    )
+
+
+def _read_polars(path: Path, compression: Optional[str]) -> tuple[list[str], Iterator[tuple]]:
+    """Parse with polars, or raise EngineError where it would differ from the stdlib.
+
+    Polars reports both an empty cell and a field missing from a short row
+    (or a blank line) as null. Only the last column can hold padding, so a
+    file with a null there is left to the stdlib parser; every other null
+    is an empty cell. The same goes for a stray carriage return before a
+    line break, which polars keeps in the last value.
+    """
+    import polars as pl
+
+    header = read_header(path, compression)
+    if not header:
+        return header, iter(())
+    if len(set(header)) != len(header):
+        # Polars renames duplicate columns; the stdlib lets the last one win
+        raise EngineError("CSV header has duplicate column names")
+    try:
+        with open_binary(path, compression) as source:
+            frame = pl.read_csv(
+                source,
+                infer_schema_length=0,  # Every column as text
+                truncate_ragged_lines=False,
+                raise_if_empty=False,
+            )
+    except pl.exceptions.PolarsError as e:
+        raise EngineError(str(e)) from e
+
+    if len(frame.columns) != len(header):
+        raise EngineError("header and columns do not line up")
+    last = frame.get_column(frame.columns[-1])
+    if last.null_count() or last.str.contains("\r", literal=True).any():
+        raise EngineError("short rows, blank lines or stray line breaks")
+    # Same newline translation as reading the file in text mode
+    frame = frame.select(pl.all().fill_null("").str.replace_all(_NEWLINE_PATTERN, "\n"))
+    columns = [frame.get_column(name).to_list() for name in frame.columns]
+    return header, zip(*columns)
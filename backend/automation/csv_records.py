@@ -0,0 +1,135 @@
+"""
+CSV Records module.
+Byte-level helpers for finding record boundaries in CSV exports.
+
+A record ends at a newline only when it contains an even number of quote
+characters, which keeps quoted multi-line fields (e.g. multi-line link text)
+inside a single record without running the full CSV parser.
+"""
+
+import csv
+from typing import BinaryIO, Iterator
+
+
+def iter_records(f: BinaryIO) -> Iterator[tuple[int, bytes]]:
+    """Yield (byte offset, raw bytes) for each record from the current position.
+
+    The last record is yielded even if the file does not end with a newline.
+    """
+    start = f.tell()
+    pos = start
+    parts: list[bytes] = []
+    quotes = 0
+
+    for line in f:
+        parts.append(line)
+        quotes += line.count(b'"')
+        pos += len(line)
+        if quotes % 2 == 0:
+            yield start, parts[0] if len(parts) == 1 else b"".join(parts)
+            start = pos
+            parts = []
+            quotes = 0
+
+    if parts:
+        yield start, b"".join(parts)
+
+
+def complete_prefix(buf: bytes) -> int:
+    """Length of the longest prefix of buf made only of complete, newline-terminated records."""
+    end = 0
+    pos = 0
+    odd = False
+    while True:
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            return end
+        odd ^= buf.count(b'"', pos, nl) & 1
+        pos = nl + 1
+        if not odd:
+            end = pos
+
+
+def parse_record(record: bytes) -> list[str]:
+    """Split a single raw record into its field values."""
+    text = record.decode("utf-8").rstrip("\r\n")
+    if '"' not in text:
+        # Fast path: no quoting means a plain split is exact
+        return text.split(",")
+    return next(csv.reader([text]), [])
+
+
+def record_starts(f: BinaryIO, targets: list[int], block_size: int = 1 << 22) -> list[int]:
+    """Find the first record start at or after each target byte offset.
+
+    The file must be positioned at a record start. Quote parity is tracked
+    with bytes.count over large blocks, so this only touches the bytes once
+    and never runs the CSV parser. Targets past the end map to the file size.
+    """
+    pending = sorted(targets)
+    starts: list[int] = []
+    base = f.tell()  # Absolute offset of block[0]
+    odd = False      # Inside a quoted field at the scanned position
+
+    while pending and pending[0] <= base:
+        starts.append(base)
+        pending.pop(0)
+
+    while pending:
+        block = f.read(block_size)
+        if not block:
+            break
+        k = 0  # Scanned up to block[k]
+
+        while pending:
+            # A record starting at or after the target follows a newline at index >= target - 1
+            j = max(pending[0] - base - 1, k)
+            if j >= len(block):
+                break
+            odd ^= block.count(b'"', k, j) & 1
+            k = j
+
+            nl = block.find(b"\n", k)
+            while nl != -1:
+                odd ^= block.count(b'"', k, nl) & 1
+                k = nl + 1
+                if not odd:
+                    break
+                nl = block.find(b"\n", k)
+            if nl == -1:
+                break
+
+            start = base + k
+            while pending and pending[0] <= start:
+                starts.append(start)
+                pending.pop(0)
+
+        odd ^= block.count(b'"', k) & 1
+        base += len(block)
+
+    # Targets past the last record boundary
+    starts.extend(base for _ in pending)
+    return starts
+
+
+def split_byte_ranges(path, chunk_bytes: int) -> tuple[int, list[tuple[int, int]]]:
+    """Split a CSV file into record-aligned byte ranges of roughly chunk_bytes.
+
+    Returns the end offset of the header record and the list of
+    [start, end) ranges covering every data row.
+    """
+    with open(path, "rb") as f:
+        header = next(iter_records(f), None)
+        if header is None:
+            return 0, []
+        header_end = len(header[1])
+        size = f.seek(0, 2)
+        if size <= header_end:
+            return header_end, []
+
+        f.seek(header_end)
+        targets = list(range(header_end + chunk_bytes, size, chunk_bytes))
+        bounds = [header_end, *record_starts(f, targets), size]
+
+    ranges = [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+    return header_end, ranges
@@ -0,0 +1,231 @@
+"""
+Describe Batcher module.
+Micro-batches small workflow step requests into shared LLM calls.
+
+Under load the server receives many small /api/describe calls per second,
+each its own round trip to the analysis model. The batcher holds requests
+for a few milliseconds (or until a batch is full), sends one prompt that
+contains every workflow under a key, asks for a JSON array with one plan
+per key, and hands each caller its own plan. A slot that is missing or
+does not parse, or a batch call that fails outright, falls back to an
+individual request for the affected callers. Recordings too large to share
+a prompt always go on their own. Each plan is cached under the key an
+individual request would use, so a repeat is answered from the response
+cache whether it was first described alone or in a batch.
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+from .llm_client import WORKFLOW_PLAN_SCHEMA, WORKFLOW_STEPS_PROMPT, LLMClient
+from .json_repair import repair_json
+from .prompt_encoding import EventLine, encoded_tokens
+from .response_cache import cache_key
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT_MS = 10
+# Workflows larger than this are described on their own
+DEFAULT_ITEM_TOKEN_BUDGET = 1500
+
+
+BATCH_WORKFLOW_STEPS_PROMPT = WORKFLOW_STEPS_PROMPT + """
+
+BATCH MODE: You will receive several independent recorded workflows, each introduced by "Workflow <key>:".
+Analyze every workflow separately and output ONLY a JSON array with one object per workflow, in the structure above plus a "key" field holding that workflow's key, e.g.:
+[{"key": "w1", "title": "...", "description": "...", "steps": [...], "required_inputs": [...]}]"""
+
+
+# One plan per workflow, tagged with the workflow's key
+BATCH_PLAN_SCHEMA = {
+    "type": "array",
+    "items": {
+        **WORKFLOW_PLAN_SCHEMA,
+        "properties": {"key": {"type": "string"}, **WORKFLOW_PLAN_SCHEMA["properties"]},
+        "required": ["key", *WORKFLOW_PLAN_SCHEMA["required"]],
+    },
+}
+
+
+class _Pending:
+    """A request waiting for its batch."""
+
+    def __init__(
+        self,
+        events_summary: list[EventLine],
+        input_fields: list[dict],
+        start_url: str,
+        user_prompt: str,
+        cache_entry: str,
+    ):
+        self.events_summary = events_summary
+        self.input_fields = input_fields
+        self.start_url = start_url
+        # The prompt and cache key an individual request would use
+        self.user_prompt = user_prompt
+        self.cache_entry = cache_entry
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class DescribeBatcher:
+    """Groups concurrent generate_workflow_steps calls for one LLMClient."""
+
+    def __init__(
+        self,
+        client: LLMClient,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        item_token_budget: int = DEFAULT_ITEM_TOKEN_BUDGET,
+    ):
+        self.client = client
+        self._llm = client.llm_pro.bind(
+            response_mime_type="application/json",
+            response_schema=BATCH_PLAN_SCHEMA,
+        )
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.item_token_budget = item_token_budget
+
+        self._pending: list[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.batched_requests = 0
+        self.fallbacks = 0
+
+    async def generate_workflow_steps(self, events: list[dict], start_url: str = "") -> dict:
+        """Same result as LLMClient.agenerate_workflow_steps, possibly shared with other calls."""
+        events_summary, input_fields = self.client._format_events(events)
+        if not events_summary or encoded_tokens(events_summary) > self.item_token_budget:
+            return await self.client.agenerate_workflow_steps(events, start_url)
+
+        user_prompt = self.client._steps_prompt(events_summary, start_url)
+        cache_entry = cache_key(self.client.analysis_model, WORKFLOW_STEPS_PROMPT, user_prompt)
+        cache = self.client.cache
+        if cache is not None and cache.get(cache_entry) is not None:
+            # Described before, alone or in a batch: the client answers from the cache
+            return await self.client._ainvoke_workflow_steps(user_prompt, events_summary, input_fields)
+
+        pending = _Pending(events_summary, input_fields, start_url, user_prompt, cache_entry)
+        self._pending.append(pending)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+        return await pending.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        try:
+            if len(batch) == 1:
+                await self._run_single(batch[0])
+                return
+
+            self.batches += 1
+            self.batched_requests += len(batch)
+            try:
+                slots = await self.client._acomplete(
+                    self._llm,
+                    self.client.analysis_model,
+                    BATCH_WORKFLOW_STEPS_PROMPT,
+                    self._batch_prompt(batch),
+                    parse=_parse_slots,
+                )
+            except Exception as e:
+                print(f"Batched workflow steps generation failed: {e}")
+                slots = {}
+
+            retries = []
+            for n, pending in enumerate(batch, 1):
+                slot = slots.get(f"w{n}")
+                # A slot cut short would pass validation with placeholder values
+                if not isinstance(slot, dict) or not all(
+                    field in slot for field in WORKFLOW_PLAN_SCHEMA["required"]
+                ):
+                    retries.append(pending)
+                    continue
+                slot = {k: v for k, v in slot.items() if k != "key"}
+                try:
+                    result = self.client._parse_workflow_steps(json.dumps(slot), pending.input_fields)
+                except (ValueError, TypeError):
+                    # e.g. steps that are not objects
+                    retries.append(pending)
+                    continue
+                # Cached as if it had been described on its own
+                if self.client.cache is not None:
+                    self.client.cache.set(pending.cache_entry, json.dumps(slot))
+                if not pending.future.done():
+                    pending.future.set_result(result)
+
+            # Slots that failed get an individual request
+            self.fallbacks += len(retries)
+            await asyncio.gather(*(self._run_single(pending) for pending in retries))
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+
+    async def _run_single(self, pending: _Pending) -> None:
+        result = await self.client._ainvoke_workflow_steps(
+            pending.user_prompt, pending.events_summary, pending.input_fields
+        )
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    def _batch_prompt(self, batch: list[_Pending]) -> str:
+        parts = [
+            f"Workflow w{n}:\n"
+            f"Starting URL: {pending.start_url}\n"
+            f"Detailed events:\n{self.client._events_text(pending.events_summary)}"
+            for n, pending in enumerate(batch, 1)
+        ]
+        return f"""Here are {len(batch)} independent recorded browser workflows:
+
+""" + "\n\n---\n\n".join(parts) + f"""
+
+IMPORTANT: 
+1. Analyze each workflow separately and detect ALL input fields that need user values (pay special attention to INPUT events marked with [PASSWORD FIELD], [EMAIL FIELD], [2FA/OTP CODE FIELD]).
+2. For login/authentication flows, make sure to include username/email, password, and any 2FA fields in required_inputs.
+3. Generate descriptions that use placeholders like {{username}}, {{password}}, {{auth_code}} for the detected inputs.
+4. U#/T# codes refer to the legend of the same workflow; write out the full URL or title in your output, never the code.
+5. Return a JSON array with exactly {len(batch)} objects, keys w1 to w{len(batch)}."""
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def _parse_slots(content: str) -> dict[str, dict]:
+    """Parse a batch response into key -> plan object; raises unless it is a JSON array."""
+    try:
+        items = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            items = json.loads(repair_json(content, close_truncated=False))
+        except json.JSONDecodeError:
+            # Cut off: the plans before the last one are complete; the last
+            # one may have lost steps, so its caller gets its own request
+            items = json.loads(repair_json(content))
+            if isinstance(items, list):
+                items = items[:-1]
+    if not isinstance(items, list):
+        raise ValueError("batch response is not a JSON array")
+    return {
+        str(item.get("key")): item
+        for item in items
+        if isinstance(item, dict)
+    }
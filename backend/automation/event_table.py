@@ -0,0 +1,347 @@
+"""
+Event Table module.
+Column-oriented storage for workflow events.
+
+A WorkflowEvent dataclass carries its own data dict and its own copies of the
+URL and title strings, which adds up to well over a kilobyte per event on
+large exports. EventTable keeps the same information in typed arrays instead:
+
+- timestamps as int64
+- event types as small integer codes into an interned name list
+- URLs and titles dictionary-encoded (each distinct string stored once)
+- data fields as sparse per-key columns of (row, value code) pairs
+
+Indexing or iterating the table yields ordinary WorkflowEvent objects, so
+code written against a list of events keeps working.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, overload
+
+from .workflow_loader import WorkflowEvent
+
+
+class _Dictionary:
+    """Maps distinct values to dense integer codes."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: list = []
+        self.codes: dict = {}
+
+    def encode(self, value) -> int:
+        if type(value) is str:
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(sys.intern(value))
+            return code
+
+        # Keep 1, 1.0 and True apart; they compare equal as dict keys
+        key = (type(value), value)
+        try:
+            code = self.codes.get(key)
+        except TypeError:
+            # Unhashable values (nested dicts/lists from JSON) are stored as-is
+            self.values.append(value)
+            return len(self.values) - 1
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    @classmethod
+    def from_values(cls, values: list) -> "_Dictionary":
+        """Rebuild a dictionary from its value list (codes are list positions)."""
+        dictionary = cls()
+        dictionary.values = values
+        for code, value in enumerate(values):
+            key = value if type(value) is str else (type(value), value)
+            try:
+                dictionary.codes.setdefault(key, code)
+            except TypeError:
+                pass
+        return dictionary
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.values) + sys.getsizeof(self.codes) + sum(
+            sys.getsizeof(v) for v in self.values
+        )
+
+
+class EventTable:
+    """Array-backed sequence of workflow events."""
+
+    def __init__(self, events: Optional[Iterable[WorkflowEvent]] = None):
+        self._timestamps = array("q")
+        self._types = array("H")
+        self._urls = array("I")
+        self._titles = array("I")
+
+        self._type_names = _Dictionary()
+        self._strings = _Dictionary()  # Shared by url and title columns
+        self._values = _Dictionary()   # Shared by all data columns
+
+        # data key -> (row numbers, value codes), rows kept in ascending order
+        self._data: dict[str, tuple[array, array]] = {}
+
+        if events is not None:
+            self.extend(events)
+
+    @classmethod
+    def from_events(cls, events: Iterable[WorkflowEvent]) -> "EventTable":
+        """Build a table from existing WorkflowEvent objects."""
+        return cls(events)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def append(self, event: WorkflowEvent) -> None:
+        """Append one event."""
+        self.add(event.event_type, event.timestamp, event.url, event.title, event.data)
+
+    def extend(self, events: Iterable[WorkflowEvent]) -> None:
+        """Append several events."""
+        if isinstance(events, EventTable):
+            self.extend_table(events)
+            return
+        for event in events:
+            self.add(event.event_type, event.timestamp, event.url, event.title, event.data)
+
+    def add(self, event_type: str, timestamp: int, url: str, title: str, data: Optional[dict] = None) -> None:
+        """Append one event from its fields, without building a WorkflowEvent."""
+        row = len(self._timestamps)
+        self._timestamps.append(timestamp)
+        self._types.append(self._type_names.encode(event_type))
+        self._urls.append(self._strings.encode(url))
+        self._titles.append(self._strings.encode(title))
+
+        if data:
+            for key, value in data.items():
+                column = self._data.get(key)
+                if column is None:
+                    column = self._data[key] = (array("I"), array("I"))
+                column[0].append(row)
+                column[1].append(self._values.encode(value))
+
+    def extend_table(self, other: "EventTable") -> None:
+        """Append every row of another table, re-mapping its dictionary codes."""
+        offset = len(self)
+        type_map = [self._type_names.encode(v) for v in other._type_names.values]
+        string_map = [self._strings.encode(v) for v in other._strings.values]
+        value_map = [self._values.encode(v) for v in other._values.values]
+
+        self._timestamps.extend(other._timestamps)
+        self._types.extend(map(type_map.__getitem__, other._types))
+        self._urls.extend(map(string_map.__getitem__, other._urls))
+        self._titles.extend(map(string_map.__getitem__, other._titles))
+
+        for key, (rows, codes) in other._data.items():
+            column = self._data.get(key)
+            if column is None:
+                column = self._data[key] = (array("I"), array("I"))
+            column[0].extend(map(offset.__add__, rows))
+            column[1].extend(map(value_map.__getitem__, codes))
+
+    def sort_by_timestamp(self) -> None:
+        """Stable-sort rows by timestamp, like list.sort(key=timestamp)."""
+        timestamps = self._timestamps
+        if all(a <= b for a, b in zip(timestamps, timestamps[1:])):
+            return
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+
+        self._timestamps = array("q", map(timestamps.__getitem__, order))
+        self._types = array("H", map(self._types.__getitem__, order))
+        self._urls = array("I", map(self._urls.__getitem__, order))
+        self._titles = array("I", map(self._titles.__getitem__, order))
+
+        new_row = array("I", bytes(4 * len(order)))
+        for new, old in enumerate(order):
+            new_row[old] = new
+        for key, (rows, codes) in self._data.items():
+            rows = array("I", map(new_row.__getitem__, rows))
+            column_order = sorted(range(len(rows)), key=rows.__getitem__)
+            self._data[key] = (
+                array("I", map(rows.__getitem__, column_order)),
+                array("I", map(codes.__getitem__, column_order)),
+            )
+
+    # ------------------------------------------------------------------
+    # Raw columns (used by the binary workflow cache)
+    # ------------------------------------------------------------------
+
+    def columns(self) -> dict:
+        """Expose the dictionaries and typed columns backing this table."""
+        return {
+            "type_names": self._type_names.values,
+            "strings": self._strings.values,
+            "values": self._values.values,
+            "timestamps": self._timestamps,
+            "types": self._types,
+            "urls": self._urls,
+            "titles": self._titles,
+            "data": self._data,
+        }
+
+    @classmethod
+    def from_columns(
+        cls,
+        type_names: list,
+        strings: list,
+        values: list,
+        timestamps: array,
+        types: array,
+        urls: array,
+        titles: array,
+        data: dict[str, tuple[array, array]],
+    ) -> "EventTable":
+        """Build a table directly from the output of columns()."""
+        table = cls()
+        table._type_names = _Dictionary.from_values(type_names)
+        table._strings = _Dictionary.from_values(strings)
+        table._values = _Dictionary.from_values(values)
+        table._timestamps = timestamps
+        table._types = types
+        table._urls = urls
+        table._titles = titles
+        table._data = data
+        return table
+
+    def split(self, bounds: list[tuple[int, int]]) -> list["EventTable"]:
+        """Cut the table into row ranges that share this table's dictionaries.
+
+        Dictionaries are append-only, so the pieces can keep growing
+        independently without invalidating each other's codes.
+        """
+        pieces = []
+        for start, end in bounds:
+            piece = EventTable()
+            piece._type_names = self._type_names
+            piece._strings = self._strings
+            piece._values = self._values
+            piece._timestamps = self._timestamps[start:end]
+            piece._types = self._types[start:end]
+            piece._urls = self._urls[start:end]
+            piece._titles = self._titles[start:end]
+            for key, (rows, codes) in self._data.items():
+                lo = bisect_left(rows, start)
+                hi = bisect_left(rows, end, lo)
+                if lo < hi:
+                    piece._data[key] = (array("I", map((-start).__add__, rows[lo:hi])), codes[lo:hi])
+            pieces.append(piece)
+        return pieces
+
+    # ------------------------------------------------------------------
+    # Column access
+    # ------------------------------------------------------------------
+
+    @property
+    def timestamps(self) -> array:
+        """The int64 timestamp column."""
+        return self._timestamps
+
+    def event_type_at(self, row: int) -> str:
+        return self._type_names.values[self._types[row]]
+
+    def url_at(self, row: int) -> str:
+        return self._strings.values[self._urls[row]]
+
+    def title_at(self, row: int) -> str:
+        return self._strings.values[self._titles[row]]
+
+    def data_at(self, row: int) -> dict:
+        """Rebuild the data dict for one row from the sparse columns."""
+        data = {}
+        values = self._values.values
+        for key, (rows, codes) in self._data.items():
+            i = bisect_left(rows, row)
+            if i < len(rows) and rows[i] == row:
+                data[key] = values[codes[i]]
+        return data
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the table's columns and dictionaries."""
+        total = sum(
+            col.itemsize * len(col)
+            for col in (self._timestamps, self._types, self._urls, self._titles)
+        )
+        for rows, codes in self._data.values():
+            total += rows.itemsize * len(rows) + codes.itemsize * len(codes)
+        return total + self._type_names.nbytes() + self._strings.nbytes() + self._values.nbytes()
+
+    def to_list(self) -> list[WorkflowEvent]:
+        """Materialize every row as a WorkflowEvent in one bulk pass."""
+        rows_data: list[dict] = [{} for _ in range(len(self))]
+        values = self._values.values
+        for key, (rows, codes) in self._data.items():
+            for row, code in zip(rows, codes):
+                rows_data[row][key] = values[code]
+
+        type_names = self._type_names.values
+        strings = self._strings.values
+        return [
+            WorkflowEvent(type_names[t], ts, strings[u], strings[ti], data)
+            for t, ts, u, ti, data in zip(self._types, self._timestamps, self._urls, self._titles, rows_data)
+        ]
+
+    # ------------------------------------------------------------------
+    # Sequence protocol
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> WorkflowEvent: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[WorkflowEvent]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("EventTable index out of range")
+        return WorkflowEvent(
+            event_type=self.event_type_at(index),
+            timestamp=self._timestamps[index],
+            url=self.url_at(index),
+            title=self.title_at(index),
+            data=self.data_at(index),
+        )
+
+    def __iter__(self) -> Iterator[WorkflowEvent]:
+        # Walk every sparse column with its own cursor instead of searching per row
+        columns = [(key, rows, codes, len(rows)) for key, (rows, codes) in self._data.items()]
+        cursors = [0] * len(columns)
+        values = self._values.values
+        type_names = self._type_names.values
+        strings = self._strings.values
+
+        for i in range(len(self)):
+            data = {}
+            for c, (key, rows, codes, size) in enumerate(columns):
+                pos = cursors[c]
+                if pos < size and rows[pos] == i:
+                    data[key] = values[codes[pos]]
+                    cursors[c] = pos + 1
+            yield WorkflowEvent(
+                event_type=type_names[self._types[i]],
+                timestamp=self._timestamps[i],
+                url=strings[self._urls[i]],
+                title=strings[self._titles[i]],
+                data=data,
+            )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (EventTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"EventTable({len(self)} events)"
@@ -0,0 +1,172 @@
+"""
+JSON Loader module.
+Loads workflows from the extension's native nested event objects.
+
+The CSV export flattens every event into 'data.*' columns which
+WorkflowLoader then has to nest back together. NDJSON and JSON exports keep
+the events as the extension records them, so each line is decoded once
+(with orjson when it is installed) and mapped straight onto WorkflowEvent.
+
+Accepted layouts:
+    .ndjson / .jsonl   one event per line, each with a "workflow_id", or one
+                       workflow per line: {"workflow_id" | "id", "events": [...]}
+    .json              a list of events or workflows, {"workflows": [...]},
+                       {"events": [...]} of events that name their workflow,
+                       or a single workflow object
+"""
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from .compressed import detect_compression, open_binary
+from .workflow_loader import Workflow, WorkflowEvent, _gc_paused, _parse_timestamp
+
+if TYPE_CHECKING:
+    from .workflow_filter import WorkflowFilter
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+JSON_SUFFIXES = (".json", ".ndjson", ".jsonl")
+
+
+def event_from_dict(obj: dict) -> WorkflowEvent:
+    """Convert one extension event object into a WorkflowEvent.
+
+    As in the API server, 'raw' fields are merged over 'data' since raw is
+    the newer recording format.
+    """
+    data = obj.get("data")
+    raw = obj.get("raw")
+    if not isinstance(data, dict):
+        data = {}
+    if isinstance(raw, dict) and raw:
+        data = {**data, **raw}
+
+    return WorkflowEvent(
+        event_type=obj.get("event") or obj.get("event_type") or "unknown",
+        timestamp=_parse_timestamp(obj.get("timestamp")),
+        url=obj.get("url") or "",
+        title=obj.get("title") or "",
+        data=data,
+    )
+
+
+def _workflow_id(obj: dict) -> str:
+    workflow_id = obj.get("workflow_id", obj.get("id"))
+    return "default" if workflow_id is None else str(workflow_id)
+
+
+def _iter_objects(path: Path) -> Iterator:
+    """Yield the top-level event or workflow objects in a JSON/NDJSON file."""
+    compression = detect_compression(path)
+    if compression:
+        # export.ndjson.gz -> judge the layout by the inner suffix
+        suffix = Path(path.stem).suffix.lower()
+    else:
+        suffix = path.suffix.lower()
+
+    if suffix == ".json":
+        with open_binary(path, compression) as f:
+            document = _loads(f.read())
+        if isinstance(document, dict):
+            if "workflows" in document:
+                document = document["workflows"]
+            elif "events" in document and "workflow_id" not in document and "id" not in document:
+                # A bare container of events, each naming its own workflow
+                document = document["events"]
+            else:
+                # A single workflow (e.g. {"workflow_id": "7", "events": [...]}) or event
+                document = [document]
+        yield from document
+        return
+
+    with open_binary(path, compression) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield _loads(line)
+            except _JSONDecodeError as e:
+                print(f"Skipping malformed line {line_number} in {path.name}: {e}")
+
+
+def _iter_events(objects: Iterable) -> Iterator[tuple[str, WorkflowEvent]]:
+    """Yield (workflow ID, event) from a mix of event and workflow objects."""
+    for obj in objects:
+        if not isinstance(obj, dict):
+            continue
+        events = obj.get("events")
+        if isinstance(events, list):
+            workflow_id = _workflow_id(obj)
+            for event in events:
+                if isinstance(event, dict):
+                    yield workflow_id, event_from_dict(event)
+        else:
+            # An event's own "id" is not a workflow ID
+            workflow_id = obj.get("workflow_id")
+            yield "default" if workflow_id is None else str(workflow_id), event_from_dict(obj)
+
+
+class JsonWorkflowLoader:
+    """Loads workflows from NDJSON or JSON exports of nested event objects."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"JSON file not found: {self.path}")
+
+    def load(self, columnar: bool = False, where: Optional["WorkflowFilter"] = None) -> list[Workflow]:
+        """Load all workflows, events sorted by timestamp as with WorkflowLoader.load().
+
+        With where, only events matching the WorkflowFilter are kept.
+        """
+        if columnar:
+            from .event_table import EventTable
+            new_events = EventTable
+        else:
+            new_events = list
+        events_by_workflow: dict = {}
+
+        with _gc_paused():
+            for workflow_id, event in _iter_events(_iter_objects(self.path)):
+                if where is not None and not where.matches(workflow_id, event):
+                    # Keep the workflow's place in first-appearance order
+                    events_by_workflow.setdefault(workflow_id)
+                    continue
+                events = events_by_workflow.get(workflow_id)
+                if events is None:
+                    events = events_by_workflow[workflow_id] = new_events()
+                events.append(event)
+
+        workflows = []
+        for wf_id, events in events_by_workflow.items():
+            if events is None:
+                continue
+            if columnar:
+                events.sort_by_timestamp()
+            else:
+                events.sort(key=lambda e: e.timestamp)
+            workflows.append(Workflow(workflow_id=wf_id, events=events))
+        return workflows
+
+    def load_single(self, workflow_id: Optional[str] = None) -> Workflow:
+        """Load a single workflow. If workflow_id is None, returns the first workflow."""
+        workflows = self.load()
+
+        if not workflows:
+            raise ValueError("No workflows found in JSON file")
+
+        if workflow_id:
+            for wf in workflows:
+                if wf.workflow_id == workflow_id:
+                    return wf
+            raise ValueError(f"Workflow with ID '{workflow_id}' not found")
+
+        return workflows[0]
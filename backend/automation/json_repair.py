@@ -0,0 +1,112 @@
+"""
+JSON Repair module.
+Cheap local fixes for almost-valid JSON returned by a model.
+
+Even with a response schema, a model occasionally wraps its JSON in a code
+fence or prose, leaves a trailing comma, writes Python literals, or is cut
+off before the closing brackets. Re-asking costs another multi-second
+round trip, so repair_json fixes these cases in one linear pass first.
+Closing truncated output recovers the syntax but not the lost content, so
+callers that cannot use a partial value turn it off.
+"""
+
+import re
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def repair_json(text: str, close_truncated: bool = True) -> str:
+    """Return text with common defects fixed; valid JSON comes back unchanged.
+
+    With close_truncated=False, output that was cut off is returned without
+    closing its string and containers, so it still fails to parse.
+    """
+    text = _FENCE.sub("", text.strip())
+
+    # Drop prose around the value
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    text = text[min(starts):]
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                # Raw newline inside a string
+                char = "\\n"
+            out.append(char)
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                # The value is complete; ignore trailing prose
+                return "".join(out)
+            i += 1
+            continue
+        elif char.isalpha():
+            word_end = i
+            while word_end < len(text) and text[word_end].isalpha():
+                word_end += 1
+            word = text[i:word_end]
+            out.append(_LITERALS.get(word, word))
+            i = word_end
+            continue
+        out.append(char)
+        i += 1
+
+    # Truncated output: close the open string and containers
+    if not close_truncated and (in_string or stack):
+        return "".join(out)
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    _drop_trailing_comma(out)
+    _drop_dangling_key(out, stack)
+    while stack:
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: list[str]) -> None:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j:]
+
+
+def _drop_dangling_key(out: list[str], stack: list[str]) -> None:
+    """Remove an object key (or `"key":`) that never got its value."""
+    if not stack or stack[-1] != "}":
+        return
+    text = "".join(out).rstrip()
+    match = re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', text)
+    if match:
+        keep = text[:match.start() + 1]
+        if keep.endswith(","):
+            keep = keep[:-1]
+        out[:] = [keep]
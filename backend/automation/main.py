@@ -22,7 +22,8 @@ if sys.platform == "win32":
         pass
 
 from .config import config
-from .workflow_loader import WorkflowLoader
+from .workflow_loader import loader_for
+from .noise_reduction import noise_reducer
 from .llm_client import LLMClient
 from .automation_runner import AutomationRunner
 
@@ -36,7 +37,7 @@ def parse_args():
     group.add_argument(
         "--workflow",
         type=Path,
-        help="Path to CSV workflow export file",
+        help="Path to CSV (or JSON/NDJSON) workflow export file",
     )
     group.add_argument(
         "--task",
@@ -97,9 +98,14 @@ async def main_async(args):
         # Workflow mode - load CSV and generate description
         print(f"\n📂 Loading workflow from: {args.workflow}")
         
-        loader = WorkflowLoader(args.workflow)
+        loader = loader_for(args.workflow)
         workflow = loader.load_single(args.workflow_id)
         
+        if config.noise_reduction:
+            workflow, report = noise_reducer.reduce_workflow(workflow)
+            if args.verbose:
+                print(f"🧹 Noise reduction: {report}")
+        
         print(f"📊 Loaded workflow: {workflow.workflow_id}")
         print(f"   - Events: {len(workflow.events)}")
         print(f"   - Start URL: {workflow.start_url}")
@@ -111,7 +117,7 @@ async def main_async(args):
         # Generate task description using LLM
         print("\n🤖 Generating task description with LLM...")
         llm_client = LLMClient()
-        task_description = llm_client.generate_task_description(workflow)
+        task_description = llm_client.generate_segmented_description(workflow)
         
         print(f"\n✨ Generated task description:")
         print(f"   {task_description}")
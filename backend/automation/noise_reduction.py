@@ -0,0 +1,268 @@
+"""
+Noise Reduction module.
+Server-side counterpart of the extension's noiseReduction.js.
+
+Recorded workflows are full of events that add prompt tokens without adding
+meaning: bursts of scroll events, a focus immediately followed by a click on
+the same element, double clicks, and events on non-interactive elements
+(SCRIPT, STYLE, ...). NoiseReducer removes them in a single pass over each
+workflow before it is summarized or sent to the LLM.
+
+The pass is built from small steps. Each step looks at an event and the
+last event kept so far and answers KEEP, DROP or REPLACE (the new event
+supersedes the last kept one), so steps compose without extra passes over
+the events. Both WorkflowEvent objects and the event dicts posted to the
+API server are supported.
+
+The steps run per event rather than over whole columns. Scroll coalescing
+and focus/click dedup compare each event with the last one kept, so every
+verdict depends on the ones before it. The one stateless check reads the
+same per-event fields a column extraction would, so building columns in
+Python first costs as much as it saves.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from .workflow_loader import Workflow, WorkflowEvent, estimate_tokens
+
+KEEP = 0
+DROP = 1
+REPLACE = 2
+
+INSIGNIFICANT_TAGS = frozenset({"SCRIPT", "STYLE", "LINK", "META", "NOSCRIPT"})
+
+
+# ----------------------------------------------------------------------
+# Field access for WorkflowEvent objects and API event dicts
+# ----------------------------------------------------------------------
+
+def _event_type(event) -> str:
+    if isinstance(event, WorkflowEvent):
+        return event.event_type
+    return event.get("event_type") or event.get("event") or "unknown"
+
+
+def _timestamp(event) -> int:
+    if isinstance(event, WorkflowEvent):
+        return event.timestamp
+    return event.get("timestamp") or 0
+
+
+def _url(event) -> str:
+    if isinstance(event, WorkflowEvent):
+        return event.url
+    return event.get("url") or ""
+
+
+def _field(event, *keys: str) -> Any:
+    """First non-empty value among data keys (and raw/automation for API dicts)."""
+    if isinstance(event, WorkflowEvent):
+        sources = (event.data,)
+    else:
+        sources = tuple(
+            source for source in (event.get("raw"), event.get("data"), event.get("automation"))
+            if isinstance(source, dict)
+        )
+    for source in sources:
+        for key in keys:
+            value = source.get(key)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _tag(event) -> Optional[str]:
+    # DOM tag names are upper case; lower-case values such as "link" are
+    # semantic element types from older recordings, not <link> tags
+    tag = _field(event, "tag", "element_type", "tagName")
+    return str(tag) if tag else None
+
+
+def _scroll_position(event) -> float:
+    value = _field(event, "scroll_y", "scrollY", "y")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _element_key(event) -> Optional[tuple]:
+    """Identify the element an event targets, or None if the recording does not say."""
+    locator = _field(event, "xpath", "selector")
+    if locator:
+        return (_url(event), locator)
+    tag = _tag(event)
+    text = _field(event, "text", "fieldName", "field")
+    if tag or text:
+        return (_url(event), tag, text)
+    return None
+
+
+def _event_text(event) -> str:
+    """The text an event contributes to a prompt, used for token accounting."""
+    if isinstance(event, WorkflowEvent):
+        return f"{event.description} {event.url}"
+    return f"{_event_type(event)} {_url(event)} {event.get('title') or ''} {event.get('data') or ''} {event.get('raw') or ''}"
+
+
+# ----------------------------------------------------------------------
+# Steps
+# ----------------------------------------------------------------------
+
+Step = Callable[[Any, Optional[Any]], int]
+
+
+def insignificant_element_step(event, last) -> int:
+    """Drop events on non-interactive elements, and focus/blur without a real target."""
+    tag = _tag(event)
+    if tag in INSIGNIFICANT_TAGS:
+        return DROP
+    if _event_type(event) in ("focus", "blur") and tag is None:
+        return DROP
+    return KEEP
+
+
+def scroll_coalescing_step(
+    window_ms: int = 1000,
+    threshold_px: float = 50,
+) -> Step:
+    """Collapse a burst of scrolls on one page into its final position."""
+    def step(event, last) -> int:
+        if last is None or _event_type(event) != "scroll" or _event_type(last) != "scroll":
+            return KEEP
+        if _url(event) != _url(last):
+            return KEEP
+        close_in_time = _timestamp(event) - _timestamp(last) <= window_ms
+        small_move = abs(_scroll_position(event) - _scroll_position(last)) < threshold_px
+        return REPLACE if close_in_time or small_move else KEEP
+    return step
+
+
+def focus_click_dedup_step(window_ms: int = 1000) -> Step:
+    """Remove focus events made redundant by a click, and repeated clicks or focuses."""
+    def step(event, last) -> int:
+        if last is None:
+            return KEEP
+        event_type = _event_type(event)
+        last_type = _event_type(last)
+        if event_type not in ("click", "focus") or last_type not in ("click", "focus"):
+            return KEEP
+        if _timestamp(event) - _timestamp(last) > window_ms:
+            return KEEP
+        key = _element_key(event)
+        if key is None or key != _element_key(last):
+            return KEEP
+        if last_type == "focus" and event_type == "click":
+            # Clicking an element focuses it; the click says more
+            return REPLACE
+        if event_type == last_type or event_type == "focus":
+            # Double click, repeated focus, or focus right after the click
+            return DROP
+        return KEEP
+    return step
+
+
+DEFAULT_STEPS: dict[str, Step] = {
+    "insignificant_elements": insignificant_element_step,
+    "scroll_coalescing": scroll_coalescing_step(),
+    "focus_click_dedup": focus_click_dedup_step(),
+}
+
+
+# ----------------------------------------------------------------------
+# Reducer
+# ----------------------------------------------------------------------
+
+@dataclass
+class NoiseReport:
+    """How much a noise reduction pass removed."""
+
+    events_before: int = 0
+    events_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    removed_by_step: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def events_removed(self) -> int:
+        return self.events_before - self.events_after
+
+    @property
+    def tokens_removed(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def add(self, other: "NoiseReport") -> None:
+        """Accumulate another report into this one."""
+        self.events_before += other.events_before
+        self.events_after += other.events_after
+        self.tokens_before += other.tokens_before
+        self.tokens_after += other.tokens_after
+        for name, count in other.removed_by_step.items():
+            self.removed_by_step[name] = self.removed_by_step.get(name, 0) + count
+
+    def __str__(self) -> str:
+        return (
+            f"removed {self.events_removed}/{self.events_before} events, "
+            f"~{self.tokens_removed}/{self.tokens_before} tokens"
+        )
+
+
+class NoiseReducer:
+    """Runs noise reduction steps over workflows in one pass per workflow."""
+
+    def __init__(self, steps: Optional[dict[str, Step]] = None):
+        self.steps = dict(DEFAULT_STEPS if steps is None else steps)
+
+    def reduce(self, events: Iterable) -> tuple[list, NoiseReport]:
+        """Filter a timestamp-ordered sequence of events (WorkflowEvents or dicts)."""
+        steps = list(self.steps.items())
+        report = NoiseReport(removed_by_step={name: 0 for name in self.steps})
+        kept: list = []
+        kept_tokens: list[int] = []
+
+        for event in events:
+            tokens = estimate_tokens(_event_text(event))
+            report.events_before += 1
+            report.tokens_before += tokens
+
+            last = kept[-1] if kept else None
+            for name, step in steps:
+                verdict = step(event, last)
+                if verdict != KEEP:
+                    report.removed_by_step[name] += 1
+                    break
+            else:
+                verdict = KEEP
+
+            if verdict == KEEP:
+                kept.append(event)
+                kept_tokens.append(tokens)
+            elif verdict == REPLACE:
+                kept[-1] = event
+                kept_tokens[-1] = tokens
+
+        report.events_after = len(kept)
+        report.tokens_after = sum(kept_tokens)
+        return kept, report
+
+    def reduce_workflow(self, workflow: Workflow) -> tuple[Workflow, NoiseReport]:
+        """Return a new Workflow without the noise, keeping list or EventTable storage."""
+        events, report = self.reduce(workflow.events)
+        if not isinstance(workflow.events, list):
+            events = type(workflow.events)(events)
+        return Workflow(workflow_id=workflow.workflow_id, events=events), report
+
+    def reduce_workflows(self, workflows: Iterable[Workflow]) -> tuple[list[Workflow], NoiseReport]:
+        """Reduce many workflows, with one report for all of them."""
+        total = NoiseReport(removed_by_step={name: 0 for name in self.steps})
+        reduced = []
+        for workflow in workflows:
+            workflow, report = self.reduce_workflow(workflow)
+            reduced.append(workflow)
+            total.add(report)
+        return reduced, total
+
+
+# Default instance
+noise_reducer = NoiseReducer()
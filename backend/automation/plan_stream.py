@@ -0,0 +1,126 @@
+"""
+Plan Stream module.
+Incremental parsing of a workflow plan while the model is still writing it.
+
+The analysis model returns one JSON object (title, description, steps,
+required_inputs) and takes several seconds to finish it. PlanStreamParser
+is fed the text as it streams in and reports every top-level field as soon
+as its value is complete, and every object in the steps/required_inputs
+arrays as soon as that object closes, so the UI can show the title and the
+first steps long before the response ends.
+"""
+
+import json
+from typing import Any, Optional
+
+# Event kinds reported by PlanStreamParser.feed
+FIELD = "field"
+ITEM = "item"
+
+
+class PlanStreamParser:
+    """Reports complete fields and array items of a streamed JSON object.
+
+    Text before the first "{" (e.g. a ```json fence) is ignored. Fields are
+    reported as (FIELD, key, value) and objects inside top-level arrays as
+    (ITEM, key, object); an array field is also reported as a whole once it
+    closes.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._after_colon = False
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """The top-level object has closed."""
+        return self._done
+
+    def feed(self, delta: str) -> list[tuple[str, Optional[str], Any]]:
+        """Add streamed text; return the fields and items it completed."""
+        self.text += delta
+        events: list[tuple[str, Optional[str], Any]] = []
+        text = self.text
+        i = self._pos
+        while i < len(text) and not self._done:
+            char = text[i]
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._stack.append("{")
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._end_string(i, events)
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+                if depth == 1 and self._after_colon and self._value_start is None:
+                    self._value_start = i
+            elif char in "{[":
+                if depth == 1 and self._after_colon and self._value_start is None:
+                    self._value_start = i
+                elif depth == 2 and char == "{" and self._stack[-1] == "[":
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 0:
+                    self._emit_primitive(i, events)
+                    self._done = True
+                elif depth == 1 and self._value_start is not None:
+                    self._emit(FIELD, json.loads(text[self._value_start:i + 1]), events)
+                elif depth == 2 and self._item_start is not None:
+                    events.append((ITEM, self._key, json.loads(text[self._item_start:i + 1])))
+                    self._item_start = None
+            elif depth == 1:
+                if char == ":":
+                    self._after_colon = True
+                    self._value_start = None
+                elif char == ",":
+                    self._emit_primitive(i, events)
+                elif self._after_colon and self._value_start is None and not char.isspace():
+                    # Number, true, false or null
+                    self._value_start = i
+            i += 1
+        self._pos = i
+        return events
+
+    def _end_string(self, end: int, events: list) -> None:
+        value = json.loads(self.text[self._string_start:end + 1])
+        if self._after_colon:
+            self._emit(FIELD, value, events)
+        else:
+            self._key = value
+
+    def _emit_primitive(self, end: int, events: list) -> None:
+        if self._after_colon and self._value_start is not None:
+            self._emit(FIELD, json.loads(self.text[self._value_start:end].strip()), events)
+
+    def _emit(self, kind: str, value: Any, events: list) -> None:
+        events.append((kind, self._key, value))
+        self._after_colon = False
+        self._value_start = None
@@ -0,0 +1,164 @@
+"""
+Prompt Encoding module.
+Compact, token-budgeted rendering of event lines for LLM prompts.
+
+Long recordings repeat the same URLs and page titles on almost every event.
+Instead of writing them out each time, strings that occur more than once go
+into a legend at the top of the event list (U1 = https://..., T1 = ...) and
+event lines refer to them by code. Free text is truncated, and if the lines
+still exceed the token budget the least important events are left out,
+keeping inputs (needed for required_inputs) until last.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from .workflow_loader import estimate_tokens
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 8000
+# Chunk size for map-reduce description of recordings over the prompt budget
+DEFAULT_CHUNK_TOKEN_BUDGET = 4000
+DEFAULT_TEXT_LIMIT = 120
+
+# Priority of an event line when the budget forces some out (higher is kept longer)
+PRIORITY_INPUT = 3
+PRIORITY_ACTION = 2
+PRIORITY_OTHER = 1
+
+
+class Url(str):
+    """A URL segment of an event line, eligible for the legend."""
+
+
+class Title(str):
+    """A page title segment of an event line, eligible for the legend."""
+
+
+Segment = Union[str, Url, Title]
+
+
+def truncate(text, limit: int = DEFAULT_TEXT_LIMIT) -> str:
+    """Cut free text (link text, typed values) to a length limit."""
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+
+@dataclass
+class EventLine:
+    """One numbered event line, kept as segments until it is rendered."""
+
+    index: int
+    priority: int
+    segments: list[Segment]
+
+    def render(self, codes: Optional[dict[str, str]] = None) -> str:
+        """Render with legend codes substituted, or in full when codes is None."""
+        parts = []
+        for segment in self.segments:
+            if codes is not None and isinstance(segment, (Url, Title)):
+                parts.append(codes.get(segment, segment))
+            else:
+                parts.append(segment)
+        return f"{self.index}. " + "".join(parts)
+
+
+def encode_event_lines(
+    lines: list[EventLine],
+    token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+) -> str:
+    """Render event lines with a URL/title legend, within a token budget."""
+    kept = _fit_budget(lines, token_budget)
+    codes, legend = _build_legend(kept)
+
+    rendered = []
+    previous = 0
+    for line in kept:
+        if line.index > previous + 1:
+            rendered.append(f"... ({line.index - previous - 1} minor events omitted)")
+        rendered.append(line.render(codes))
+        previous = line.index
+    if lines and kept and lines[-1].index > kept[-1].index:
+        rendered.append(f"... ({lines[-1].index - kept[-1].index} minor events omitted)")
+
+    if not legend:
+        return "\n".join(rendered)
+    return (
+        "Legend (U# = URL, T# = page title):\n"
+        + "\n".join(legend)
+        + "\n\nEvents:\n"
+        + "\n".join(rendered)
+    )
+
+
+def encoded_tokens(lines: list[EventLine]) -> int:
+    """Estimated prompt tokens of the lines encoded with their legend."""
+    codes, legend = _build_legend(lines)
+    return sum(estimate_tokens(line.render(codes)) for line in lines) + sum(
+        estimate_tokens(entry) for entry in legend
+    )
+
+
+def chunk_event_lines(
+    lines: list[EventLine],
+    token_budget: int = DEFAULT_CHUNK_TOKEN_BUDGET,
+) -> list[list[EventLine]]:
+    """Cut lines into consecutive chunks that each fit a token budget unencoded."""
+    chunks: list[list[EventLine]] = []
+    size = 0
+    for line in lines:
+        tokens = estimate_tokens(line.render())
+        if chunks and size + tokens <= token_budget:
+            chunks[-1].append(line)
+            size += tokens
+        else:
+            chunks.append([line])
+            size = tokens
+    return chunks
+
+
+def _build_legend(lines: list[EventLine]) -> tuple[dict[str, str], list[str]]:
+    """Assign codes to the URLs and titles used more than once, in order of appearance."""
+    counts: dict[str, int] = {}
+    for line in lines:
+        for segment in line.segments:
+            if isinstance(segment, (Url, Title)) and segment:
+                counts[segment] = counts.get(segment, 0) + 1
+
+    codes: dict[str, str] = {}
+    legend: list[str] = []
+    n_urls = n_titles = 0
+    for line in lines:
+        for segment in line.segments:
+            if counts.get(segment, 0) < 2 or segment in codes:
+                continue
+            if isinstance(segment, Url):
+                n_urls += 1
+                codes[segment] = f"U{n_urls}"
+            else:
+                n_titles += 1
+                codes[segment] = f"T{n_titles}"
+            legend.append(f"{codes[segment]} = {segment}")
+    return codes, legend
+
+
+def _fit_budget(lines: list[EventLine], token_budget: int) -> list[EventLine]:
+    """Drop the lowest-priority lines, latest first, until the encoded estimate fits."""
+    codes, legend = _build_legend(lines)
+    costs = [estimate_tokens(line.render(codes)) for line in lines]
+    # Dropping lines can only shrink the legend, so this is an upper bound
+    total = sum(costs) + sum(estimate_tokens(entry) for entry in legend)
+    if total <= token_budget:
+        return lines
+
+    dropped = set()
+    for priority in (PRIORITY_OTHER, PRIORITY_ACTION):
+        for i in range(len(lines) - 1, -1, -1):
+            if total <= token_budget:
+                break
+            if lines[i].priority == priority:
+                dropped.add(i)
+                total -= costs[i]
+    # Inputs always stay: without them required_inputs cannot be detected
+    return [line for i, line in enumerate(lines) if i not in dropped]
@@ -0,0 +1,47 @@
+"""
+Rate Limit module.
+Spaces out LLM requests to stay under a per-minute quota.
+
+Bulk jobs can run many requests concurrently, so concurrency alone would
+burst past the Gemini quota. RateLimiter hands out start times at a fixed
+interval (with an optional burst allowance) and works both from threads
+and from asyncio code.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Allows at most `per_minute` request starts per minute."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.interval = 60.0 / per_minute
+        self.burst = max(1, burst)
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim the next start slot; returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            # Unused slots accumulate up to the burst size
+            earliest = now - self.interval * (self.burst - 1)
+            slot = max(self._next, earliest)
+            self._next = slot + self.interval
+            return max(0.0, slot - now)
+
+    def acquire(self) -> None:
+        """Block until a request may start."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait without blocking the event loop until a request may start."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
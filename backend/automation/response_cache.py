@@ -0,0 +1,202 @@
+"""
+Response Cache module.
+Content-addressed cache of LLM responses.
+
+The same workflows are described again and again, and every description
+costs a Gemini round trip. Responses are stored under a hash of the model,
+the system prompt and the whitespace-normalized user prompt, in two tiers:
+
+- an in-process LRU (dict lookup, answers in microseconds)
+- an on-disk SQLite store that survives restarts and is shared by workers
+
+Both tiers honour a TTL and a size bound. Only successful responses are
+stored; callers must not put fallback results from failed calls here.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .config import config
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 50_000
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str) -> str:
+    """Hash of everything that determines a response."""
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, " ".join(user_prompt.split())):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + SQLite) cache of LLM responses with TTL."""
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ):
+        # No path keeps the cache in memory only
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_entries = 0
+        self._disk_failed = False
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite store on first use; None if disabled or broken."""
+        if self._db is not None or self.path is None or self._disk_failed:
+            return self._db
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+            db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._disk_entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._db = db
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: response cache disabled on disk ({self.path}): {e}")
+            self._disk_failed = True
+        return self._db
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[str, float]]:
+        db = self._connect()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_entries -= 1
+                return None
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            print(f"Warning: response cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, value: str, expires_at: float, now: float) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        try:
+            exists = db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            if not exists:
+                self._disk_entries += 1
+            if self._disk_entries > self.max_disk_entries:
+                # Evict expired entries, then the least recently used tenth
+                db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                excess = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+                if excess > 0:
+                    excess += self.max_disk_entries // 10
+                    db.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    )
+                self._disk_entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Warning: response cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting disk hits into memory."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            entry = self._disk_get(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+            return entry[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store a successful response in both tiers."""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, (value, expires_at))
+            self._disk_set(key, value, expires_at, now)
+
+    def _remember(self, key: str, entry: tuple[str, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                self._disk_entries = 0
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_entries,
+        }
+
+
+# Default instance
+response_cache = ResponseCache(config.response_cache_path, ttl_seconds=config.response_cache_ttl)
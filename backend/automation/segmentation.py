@@ -0,0 +1,156 @@
+"""
+Segmentation module.
+Splits long recordings into sub-task segments.
+
+A single session often strings several goals together (check mail, then
+book a flight, then fill in an expense form). Workflow.summary has to fit a
+token budget, so most of a long session never reaches the LLM in a single
+description. The segmenter cuts a workflow in one linear pass wherever:
+
+- the user moves to a different site (registrable domain)
+- the user was idle for longer than a threshold
+- a form was submitted (the submit closes the current segment)
+
+Each segment is itself a Workflow, so it can be summarized and described
+on its own, and segments can be described in parallel.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+from .workflow_loader import Workflow, WorkflowEvent
+
+# Idle time that starts a new segment
+DEFAULT_IDLE_GAP_MS = 5 * 60 * 1000
+
+SUBMIT_EVENTS = frozenset({"submit", "form_submit"})
+
+# Second-level labels under which a country code TLD sells domains (example.co.uk)
+_SECOND_LEVEL_LABELS = frozenset({"co", "com", "net", "org", "gov", "edu", "ac"})
+
+
+@dataclass
+class Segment(Workflow):
+    """A contiguous slice of a workflow that forms one sub-task."""
+
+    parent_id: str = ""
+    index: int = 0
+    # Why this segment starts: "start", "domain_change", "idle_gap" or "form_submit"
+    reason: str = "start"
+    # Position of the segment's first event in the parent workflow
+    offset: int = 0
+
+
+def site_of(url: str) -> str:
+    """Registrable domain of a URL, e.g. 'mail.google.com' -> 'google.com'."""
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    labels = host.split(".")
+    if len(labels) <= 2 or labels[-1].isdigit():
+        # Short host or an IP address
+        return host
+    if len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _is_submit(event: WorkflowEvent) -> bool:
+    """A form submission, or a click on a submit button."""
+    if event.event_type in SUBMIT_EVENTS:
+        return True
+    if event.event_type == "click":
+        data = event.data
+        if data.get("input_type") == "submit" or data.get("type") == "submit":
+            return True
+        # Older recordings label the element itself, e.g. "submit_button"
+        return "submit" in str(data.get("element_type") or "").lower()
+    return False
+
+
+class Segmenter:
+    """Cuts workflows into segments at site changes, idle gaps and form submits."""
+
+    def __init__(
+        self,
+        idle_gap_ms: Optional[int] = DEFAULT_IDLE_GAP_MS,
+        split_on_domain: bool = True,
+        split_on_submit: bool = True,
+    ):
+        self.idle_gap_ms = idle_gap_ms
+        self.split_on_domain = split_on_domain
+        self.split_on_submit = split_on_submit
+        # URL -> site, shared across workflows since recordings revisit the same pages
+        self._sites: dict[str, str] = {}
+        self._max_sites = 100_000
+
+    def boundaries(self, events) -> list[tuple[int, str]]:
+        """Find (start index, reason) for every segment in one pass over the events."""
+        starts: list[tuple[int, str]] = []
+        if len(self._sites) > self._max_sites:
+            self._sites.clear()
+        sites = self._sites
+        site = ""
+        previous_ts = None
+        pending = None  # Reason for a cut before the next event
+
+        for i, event in enumerate(events):
+            reason = pending
+            pending = None
+
+            if reason is None and previous_ts is not None and self.idle_gap_ms is not None:
+                if event.timestamp - previous_ts > self.idle_gap_ms:
+                    reason = "idle_gap"
+
+            if self.split_on_domain and event.url:
+                event_site = sites.get(event.url)
+                if event_site is None:
+                    event_site = sites[event.url] = site_of(event.url)
+                if event_site and event_site != site:
+                    if site and reason is None:
+                        reason = "domain_change"
+                    site = event_site
+
+            if i == 0:
+                starts.append((0, "start"))
+            elif reason is not None:
+                starts.append((i, reason))
+
+            if self.split_on_submit and _is_submit(event):
+                pending = "form_submit"
+            previous_ts = event.timestamp
+
+        return starts
+
+    def split(self, workflow: Workflow) -> list[Segment]:
+        """Split a workflow into segments (a single segment if nothing separates it)."""
+        events = workflow.events
+        starts = self.boundaries(events)
+        bounds = [
+            (start, end)
+            for (start, _), (end, _) in zip(starts, starts[1:] + [(len(events), "")])
+        ]
+
+        if isinstance(events, list):
+            pieces = [events[start:end] for start, end in bounds]
+        else:
+            # EventTable: cut without materializing events
+            pieces = events.split(bounds)
+
+        return [
+            Segment(
+                workflow_id=f"{workflow.workflow_id}.{n + 1}",
+                events=piece,
+                parent_id=workflow.workflow_id,
+                index=n,
+                reason=reason,
+                offset=start,
+            )
+            for n, ((start, reason), piece) in enumerate(zip(starts, pieces))
+        ]
+
+
+# Default instance
+segmenter = Segmenter()
@@ -5,16 +5,22 @@ Provides REST API and WebSocket endpoints for browser automation.
 """
 
 import asyncio
+import json
 from typing import Optional
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from .config import config
 from .workflow_loader import WorkflowLoader, Workflow, WorkflowEvent
-from .llm_client import LLMClient
+from .llm_client import LLMClient, client_pool
+from .noise_reduction import noise_reducer
+from .response_cache import response_cache
+from .single_flight import SingleFlight, payload_key
+from .describe_batcher import DescribeBatcher
 from .automation_runner import AutomationRunner
 
 
@@ -89,6 +95,7 @@ class SettingsModel(BaseModel):
     llm_model: str = "gemini-flash-latest"
     analysis_model: str = "gemini-pro-latest"
     headless: bool = False
+    noise_reduction: bool = True
 
 
 class SettingsResponse(BaseModel):
@@ -105,6 +112,11 @@ class SettingsResponse(BaseModel):
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     print("🚀 AutoPattern API server starting...")
+    # Create the Gemini clients up front so the first request does not pay for it
+    try:
+        client_pool.get(runtime_settings.llm_model, runtime_settings.analysis_model)
+    except Exception as e:
+        print(f"⚠️  Could not initialize LLM clients: {e}")
     yield
     print("👋 AutoPattern API server shutting down...")
 
@@ -145,10 +157,26 @@ AVAILABLE_MODELS = [
     "gemini-2.0-flash",
 ]
 
+# Identical describe requests in flight at the same time share one LLM call
+describe_flight = SingleFlight()
+
+# Micro-batchers per pooled LLM client (used when config.describe_batching is on)
+describe_batchers: dict[tuple[str, str], DescribeBatcher] = {}
+
+
+def _describe_batcher(llm_client: LLMClient) -> DescribeBatcher:
+    key = (llm_client.model, llm_client.analysis_model)
+    batcher = describe_batchers.get(key)
+    if batcher is None or batcher.client is not llm_client:
+        # First use, or the pool rebuilt the client after a settings change
+        batcher = describe_batchers[key] = DescribeBatcher(llm_client)
+    return batcher
+
 # Runtime settings (can be modified via API)
 runtime_settings = SettingsModel(
     llm_model=config.llm_model,
     headless=config.headless,
+    noise_reduction=config.noise_reduction,
 )
 
 
@@ -165,11 +193,23 @@ async def get_settings():
 async def update_settings(new_settings: SettingsModel):
     """Update settings."""
     global runtime_settings
+    old_settings = runtime_settings
     runtime_settings = new_settings
     
+    # Rebuild pooled LLM clients only when the models changed
+    old_key = (old_settings.llm_model, old_settings.analysis_model)
+    new_key = (new_settings.llm_model, new_settings.analysis_model)
+    if new_key != old_key:
+        client_pool.discard(*old_key)
+        try:
+            client_pool.get(*new_key)
+        except Exception as e:
+            print(f"⚠️  Could not initialize LLM clients: {e}")
+    
     # Update config object for components that use it
     config.llm_model = new_settings.llm_model
     config.headless = new_settings.headless
+    config.noise_reduction = new_settings.noise_reduction
     
     return SettingsResponse(
         settings=runtime_settings,
@@ -177,6 +217,59 @@ async def update_settings(new_settings: SettingsModel):
     )
 
 
+@app.get("/api/cache")
+async def cache_stats():
+    """LLM response cache hit/miss counters."""
+    return response_cache.stats()
+
+
+def _describe_events(request: DescribeRequest) -> list[dict]:
+    """Convert describe request events to the dicts LLMClient expects."""
+    # Convert events to dict format with all available data
+    # Merge data and raw fields for backwards compatibility
+    events = []
+    for e in request.events:
+        # Combine data and raw - raw takes precedence as it's the new format
+        combined_data = {**e.data, **e.raw}
+        events.append({
+            "event_type": e.event,
+            "timestamp": e.timestamp,
+            "url": e.url,
+            "title": e.title,
+            "data": combined_data,
+            "raw": e.raw,
+            "automation": e.automation,
+        })
+    
+    if runtime_settings.noise_reduction:
+        events, report = noise_reducer.reduce(events)
+        print(f"🧹 Noise reduction: {report}")
+    return events
+
+
+def _describe_response(result: dict) -> DescribeResponse:
+    return DescribeResponse(
+        title=result.get("title", "Workflow"),
+        description=result.get("description", ""),
+        steps=result.get("steps", []),
+        required_inputs=result.get("required_inputs", [])
+    )
+
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(stream) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/api/describe", response_model=DescribeResponse)
 async def describe_workflow(request: DescribeRequest):
     """
@@ -187,40 +280,115 @@ async def describe_workflow(request: DescribeRequest):
     Also detects required input fields (username, password, 2FA, etc.).
     """
     try:
-        # Convert events to dict format with all available data
-        # Merge data and raw fields for backwards compatibility
-        events = []
-        for e in request.events:
-            # Combine data and raw - raw takes precedence as it's the new format
-            combined_data = {**e.data, **e.raw}
-            events.append({
-                "event_type": e.event,
-                "timestamp": e.timestamp,
-                "url": e.url,
-                "title": e.title,
-                "data": combined_data,
-                "raw": e.raw,
-                "automation": e.automation,
-            })
+        events = _describe_events(request)
         
         # Generate structured workflow steps using current settings
-        llm_client = LLMClient(
-            model=runtime_settings.llm_model,
-            analysis_model=runtime_settings.analysis_model
+        llm_client = client_pool.get(
+            runtime_settings.llm_model,
+            runtime_settings.analysis_model,
         )
-        result = llm_client.generate_workflow_steps(events, request.start_url)
-        
-        return DescribeResponse(
-            title=result.get("title", "Workflow"),
-            description=result.get("description", ""),
-            steps=result.get("steps", []),
-            required_inputs=result.get("required_inputs", [])
+        key = payload_key(
+            events,
+            request.start_url,
+            runtime_settings.llm_model,
+            runtime_settings.analysis_model,
         )
+        if config.describe_batching:
+            generate = _describe_batcher(llm_client).generate_workflow_steps
+        else:
+            generate = llm_client.agenerate_workflow_steps
+        result = await describe_flight.do(key, lambda: generate(events, request.start_url))
+        
+        return _describe_response(result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/describe/stream")
+async def describe_workflow_stream(request: DescribeRequest):
+    """
+    Streaming version of /api/describe (Server-Sent Events).
+    
+    Sends "delta" events with raw model text, "title" and "description" as
+    soon as each is complete, a "step" or "required_input" event per finished
+    object, and a final "done" event with the same body /api/describe returns.
+    """
+    try:
+        events = _describe_events(request)
+        llm_client = client_pool.get(
+            runtime_settings.llm_model,
+            runtime_settings.analysis_model,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def stream():
+        try:
+            async for event, data in llm_client.astream_workflow_steps(events, request.start_url):
+                if event == "delta":
+                    yield _sse("delta", {"text": data})
+                elif event == "result" and isinstance(data, dict):
+                    yield _sse("done", _describe_response(data).model_dump())
+                else:
+                    yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+    
+    return _sse_response(stream())
+
+
+@app.post("/api/describe/task/stream")
+async def describe_task_stream(request: DescribeRequest):
+    """
+    Stream a plain task description for recorded events (Server-Sent Events).
+    
+    Sends "delta" events with text as the model writes it, then "done" with
+    the complete description.
+    """
+    try:
+        events = [
+            WorkflowEvent(
+                event_type=e.event,
+                timestamp=e.timestamp,
+                url=e.url,
+                title=e.title,
+                data={**e.data, **e.raw},
+            )
+            for e in request.events
+        ]
+        if request.start_url:
+            events.insert(0, WorkflowEvent(
+                event_type="navigation",
+                timestamp=0,
+                url=request.start_url,
+                title="",
+                data={},
+            ))
+        workflow = Workflow(workflow_id="stream", events=events)
+        if runtime_settings.noise_reduction:
+            workflow, report = noise_reducer.reduce_workflow(workflow)
+            print(f"🧹 Noise reduction: {report}")
+        llm_client = client_pool.get(
+            runtime_settings.llm_model,
+            runtime_settings.analysis_model,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def stream():
+        parts = []
+        try:
+            async for delta in llm_client.astream_task_description(workflow):
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+            yield _sse("done", {"task_description": "".join(parts).strip()})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+    
+    return _sse_response(stream())
+
+
 @app.post("/api/automate", response_model=AutomateResponse)
 async def automate_workflow(request: AutomateRequest, background_tasks: BackgroundTasks):
     """
@@ -250,7 +418,9 @@ async def automate_workflow(request: AutomateRequest, background_tasks: Backgrou
                 for e in request.events
             ]
             
-            workflow = Workflow(workflow_id=request.workflow_id, events=events)
+            if runtime_settings.noise_reduction:
+                events, report = noise_reducer.reduce(events)
+                print(f"🧹 Noise reduction: {report}")
             
             # Override start_url if provided
             if request.start_url:
@@ -263,12 +433,14 @@ async def automate_workflow(request: AutomateRequest, background_tasks: Backgrou
                     data={},
                 ))
             
+            workflow = Workflow(workflow_id=request.workflow_id, events=events)
+            
             # Generate task description using LLM with current settings
-            llm_client = LLMClient(
-                model=runtime_settings.llm_model,
-                analysis_model=runtime_settings.analysis_model
+            llm_client = client_pool.get(
+                runtime_settings.llm_model,
+                runtime_settings.analysis_model,
             )
-            task_description = llm_client.generate_task_description(workflow)
+            task_description = await llm_client.agenerate_segmented_description(workflow)
         
         # Prepare sensitive_data from input_values if provided
         sensitive_data = None
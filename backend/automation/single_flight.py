@@ -0,0 +1,48 @@
+"""
+Single Flight module.
+Coalesces concurrent identical requests into one in-flight call.
+
+A double click in the dashboard, or a retry from background.js, sends the
+same /api/describe payload several times at once. Without coalescing each
+copy makes its own gemini-pro call. SingleFlight keys calls by their
+normalized payload; the first caller starts the work and everyone who
+arrives while it is running awaits the same future.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def payload_key(*parts: Any) -> str:
+    """Stable hash of JSON-like request parts (dict key order does not matter)."""
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await call(), or the call already running under this key."""
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A caller that goes away must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
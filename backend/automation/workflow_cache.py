@@ -0,0 +1,274 @@
+"""
+Workflow Cache module.
+Binary cache of parsed workflows, written next to a CSV export.
+
+After the first parse the loader stores every workflow's events as typed
+columns (see EventTable) in `<file>.apcache`. Later loads memory-map that file
+and copy the columns straight into arrays, skipping CSV tokenising, JSON
+decoding and timestamp parsing entirely.
+
+Layout:
+    fixed header   magic, version, CSV size, CSV mtime_ns, CSV blake2b digest,
+                   metadata length
+    metadata       marshal-encoded dict: workflow IDs and event counts, the
+                   string/value dictionaries and the byte span of each column
+    columns        raw array bytes; timestamps are delta-encoded and stored
+                   as int32 when every delta fits
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .event_table import EventTable
+
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".apcache"
+_MAGIC = b"APWFCACH"
+# magic, version, csv size, csv mtime_ns, csv digest, metadata length
+_HEADER = struct.Struct("<8sHQq32sQ")
+_MTIME_OFFSET = 8 + 2 + 8
+
+
+def _file_digest(path: Path) -> bytes:
+    """blake2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _delta_encode(timestamps: array) -> tuple[int, array]:
+    """Encode timestamps as a first value plus successive differences."""
+    if not timestamps:
+        return 0, array("i")
+    deltas = array("q", map(int.__sub__, timestamps[1:], timestamps))
+    if not deltas or -(2 ** 31) <= min(deltas) and max(deltas) < 2 ** 31:
+        return timestamps[0], array("i", deltas)
+    return timestamps[0], deltas
+
+
+class WorkflowCache:
+    """Reads and writes the binary cache that sits next to a CSV export."""
+
+    def __init__(self, csv_path: Path, options: Optional[dict] = None):
+        self.csv_path = csv_path
+        # Loader settings that change the parsed result; a mismatch invalidates the cache
+        self.options = options or {}
+
+    @staticmethod
+    def path_for(csv_path: Path) -> Path:
+        """Get the cache path used for a CSV file."""
+        return csv_path.with_name(csv_path.name + CACHE_SUFFIX)
+
+    @property
+    def path(self) -> Path:
+        return self.path_for(self.csv_path)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Optional[tuple[int, int, bytes]]:
+        """Size, mtime_ns and digest of the CSV, or None if it cannot be read.
+
+        Take it before parsing and pass it to write(), so the cache is stamped
+        with the file the workflows were parsed from.
+        """
+        try:
+            stat = os.stat(self.csv_path)
+            return stat.st_size, stat.st_mtime_ns, _file_digest(self.csv_path)
+        except OSError:
+            return None
+
+    def write(self, workflows: Iterable, snapshot: tuple[int, int, bytes]) -> bool:
+        """Write the cache for a list of workflows parsed from the CSV as of snapshot.
+
+        Returns False if it could not be written, or if the CSV changed since
+        the snapshot (e.g. an export still being appended to).
+        """
+        size, mtime_ns, digest = snapshot
+        try:
+            sections, meta = self._encode(workflows)
+            stat = os.stat(self.csv_path)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                # Written to while parsing; the result may not match either version
+                return False
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, CACHE_VERSION, size, mtime_ns, digest, len(meta)))
+                f.write(meta)
+                for _, column in sections:
+                    column.tofile(f)
+            os.replace(tmp_path, self.path)
+        except (OSError, ValueError, OverflowError):
+            # Unmarshallable values, timestamps or deltas outside int64, or a
+            # read-only directory: just skip caching
+            return False
+        return True
+
+    def _encode(self, workflows: Iterable) -> tuple[list[tuple[str, array]], bytes]:
+        """Column sections and marshalled metadata for a list of workflows."""
+        table = EventTable()
+        counts = []
+        for workflow in workflows:
+            table.extend(workflow.events)
+            counts.append((workflow.workflow_id, len(workflow.events)))
+
+        columns = table.columns()
+        first_ts, deltas = _delta_encode(columns["timestamps"])
+        sections: list[tuple[str, array]] = [
+            ("ts", deltas),
+            ("types", columns["types"]),
+            ("urls", columns["urls"]),
+            ("titles", columns["titles"]),
+        ]
+        data_keys = list(columns["data"])
+        for i, key in enumerate(data_keys):
+            rows, codes = columns["data"][key]
+            sections.append((f"d{i}r", rows))
+            sections.append((f"d{i}c", codes))
+
+        spans = {}
+        offset = 0
+        for name, column in sections:
+            nbytes = column.itemsize * len(column)
+            spans[name] = (column.typecode, offset, nbytes)
+            offset += nbytes
+
+        meta = marshal.dumps({
+            "options": self.options,
+            "byteorder": sys.byteorder,
+            "workflows": counts,
+            "first_ts": first_ts,
+            "type_names": columns["type_names"],
+            "strings": columns["strings"],
+            "values": columns["values"],
+            "data_keys": data_keys,
+            "spans": spans,
+        })
+        return sections, meta
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read(self, workflow_ids: Optional[set[str]] = None) -> Optional[list[tuple[str, EventTable]]]:
+        """Read (workflow ID, EventTable) pairs from a fresh cache.
+
+        Returns None when there is no cache or it no longer matches the CSV.
+        With workflow_ids, only those workflows are returned.
+        """
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return None
+
+        with f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file
+                return None
+            with mm:
+                if not self._is_fresh(mm):
+                    return None
+                meta_len = _HEADER.unpack_from(mm)[5]
+                meta_start = _HEADER.size
+                try:
+                    meta = marshal.loads(mm[meta_start:meta_start + meta_len])
+                except (EOFError, ValueError, TypeError):
+                    return None
+                if meta.get("options") != self.options:
+                    return None
+                return self._decode(mm, meta_start + meta_len, meta, workflow_ids)
+
+    def _is_fresh(self, mm: mmap.mmap) -> bool:
+        """Check the cache against the CSV's size and mtime, falling back to its digest."""
+        if len(mm) < _HEADER.size:
+            return False
+        magic, version, size, mtime_ns, digest, _ = _HEADER.unpack_from(mm)
+        if magic != _MAGIC or version != CACHE_VERSION:
+            return False
+
+        try:
+            stat = os.stat(self.csv_path)
+        except OSError:
+            return False
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+
+        # Touched but possibly unchanged (e.g. copied or re-downloaded): compare contents
+        if _file_digest(self.csv_path) != digest:
+            return False
+        try:
+            with open(self.path, "r+b") as f:
+                f.seek(_MTIME_OFFSET)
+                f.write(struct.pack("<q", stat.st_mtime_ns))
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _decode(
+        mm: mmap.mmap,
+        base: int,
+        meta: dict,
+        workflow_ids: Optional[set[str]],
+    ) -> list[tuple[str, EventTable]]:
+        """Turn the mapped column bytes back into per-workflow EventTables."""
+        swap = meta["byteorder"] != sys.byteorder
+        view = memoryview(mm)
+
+        def column(name: str) -> array:
+            typecode, offset, nbytes = meta["spans"][name]
+            values = array(typecode)
+            values.frombytes(view[base + offset:base + offset + nbytes])
+            if swap:
+                values.byteswap()
+            return values
+
+        try:
+            if sum(count for _, count in meta["workflows"]):
+                timestamps = array("q", accumulate(column("ts"), initial=meta["first_ts"]))
+            else:
+                timestamps = array("q")
+
+            data = {
+                key: (column(f"d{i}r"), column(f"d{i}c"))
+                for i, key in enumerate(meta["data_keys"])
+            }
+            table = EventTable.from_columns(
+                type_names=meta["type_names"],
+                strings=meta["strings"],
+                values=meta["values"],
+                timestamps=timestamps,
+                types=column("types"),
+                urls=column("urls"),
+                titles=column("titles"),
+                data=data,
+            )
+        finally:
+            view.release()
+
+        bounds = []
+        selected = []
+        start = 0
+        for workflow_id, count in meta["workflows"]:
+            if workflow_ids is None or workflow_id in workflow_ids:
+                bounds.append((start, start + count))
+                selected.append(workflow_id)
+            start += count
+
+        return list(zip(selected, table.split(bounds)))
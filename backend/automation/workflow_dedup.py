@@ -0,0 +1,203 @@
+"""
+Workflow Dedup module.
+Near-duplicate detection for recorded workflows with MinHash and LSH.
+
+Users record the same flow over and over. Each workflow is reduced to a set
+of shingles over its normalized event sequence (event type, canonical URL
+path, element text), the set is summarized by a MinHash signature, and the
+signatures are bucketed by LSH bands. A lookup only compares against the
+workflows that share a band bucket, so it stays fast on corpora of 100k+
+workflows, and ingest can map every copy onto one canonical workflow and
+reuse the plan generated for it.
+"""
+
+import hashlib
+import re
+from array import array
+from operator import eq
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+from .workflow_loader import Workflow, WorkflowEvent
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+
+# Path segments that identify a record rather than a page: numbers, hex ids, UUIDs
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def canonical_url(url: str) -> str:
+    """Host and path with ids collapsed; query, fragment and 'www.' dropped."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return ""
+    host = (parts.hostname or "").removeprefix("www.")
+    segments = [":id" if _ID_SEGMENT.match(s) else s for s in parts.path.split("/") if s]
+    return host + "/" + "/".join(segments)
+
+
+def event_token(event: WorkflowEvent) -> str:
+    """Normalized token for one event; typed values are left out on purpose."""
+    text = event.data.get("text") or event.data.get("field_name") or event.data.get("fieldName") or ""
+    text = _WHITESPACE.sub(" ", str(text)).strip().lower()[:40]
+    return f"{event.event_type}|{canonical_url(event.url)}|{text}"
+
+
+def workflow_shingles(workflow: Workflow, k: int = SHINGLE_SIZE) -> set[str]:
+    """Event tokens plus every run of k consecutive tokens."""
+    tokens = [event_token(event) for event in workflow.events]
+    shingles = set(tokens)
+    shingles.update("\x1f".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+    return shingles
+
+
+class DuplicateIndex:
+    """MinHash/LSH index that maps near-duplicate workflows to a canonical one."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        self._signatures: dict[str, array] = {}
+        self._canonical: dict[str, str] = {}
+        # One bucket table per band: band bytes -> keys
+        self._buckets: list[dict[bytes, list[str]]] = [{} for _ in range(bands)]
+        # Shingle -> its num_perm hash values; recordings of one flow share most shingles
+        self._shingle_hashes: dict[str, array] = {}
+        self._max_cached_shingles = 500_000
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    # ------------------------------------------------------------------
+    # Signatures
+    # ------------------------------------------------------------------
+
+    def _hashes(self, shingle: str) -> array:
+        """num_perm independent 32-bit hashes of a shingle from one SHAKE digest."""
+        values = self._shingle_hashes.get(shingle)
+        if values is None:
+            values = array("I")
+            values.frombytes(hashlib.shake_128(shingle.encode("utf-8")).digest(4 * self.num_perm))
+            if len(self._shingle_hashes) >= self._max_cached_shingles:
+                self._shingle_hashes.clear()
+            self._shingle_hashes[shingle] = values
+        return values
+
+    def signature(self, workflow: Workflow) -> array:
+        """MinHash signature of a workflow's shingle set."""
+        shingles = workflow_shingles(workflow)
+        if not shingles:
+            return array("I", [0xFFFFFFFF]) * self.num_perm
+        vectors = [self._hashes(shingle) for shingle in shingles]
+        if len(vectors) == 1:
+            return array("I", vectors[0])
+        # Element-wise minimum over all shingle hash vectors
+        return array("I", map(min, *vectors))
+
+    @staticmethod
+    def similarity(a: array, b: array) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return sum(map(eq, a, b)) / len(a)
+
+    def _bands(self, signature: array) -> list[bytes]:
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        workflow: Optional[Workflow] = None,
+        signature: Optional[array] = None,
+        threshold: Optional[float] = None,
+    ) -> list[tuple[str, float]]:
+        """Find indexed workflows similar to a workflow (or its signature), most similar first."""
+        if signature is None:
+            if workflow is None:
+                raise ValueError("query() needs a workflow or a signature")
+            signature = self.signature(workflow)
+        threshold = self.threshold if threshold is None else threshold
+
+        candidates: set[str] = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            keys = buckets.get(band)
+            if keys:
+                candidates.update(keys)
+
+        matches = []
+        for key in candidates:
+            score = self.similarity(signature, self._signatures[key])
+            if score >= threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def add(self, key: str, workflow: Optional[Workflow] = None, signature: Optional[array] = None) -> None:
+        """Index a workflow (or its signature) under a key (e.g. its workflow ID)."""
+        if signature is None:
+            if workflow is None:
+                raise ValueError("add() needs a workflow or a signature")
+            signature = self.signature(workflow)
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        self._canonical.setdefault(key, key)
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(band, []).append(key)
+
+    def remove(self, key: str) -> None:
+        """Drop a workflow from the index."""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        self._canonical.pop(key, None)
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            keys = buckets.get(band)
+            if keys is not None:
+                keys.remove(key)
+                if not keys:
+                    del buckets[band]
+
+    def add_or_match(self, key: str, workflow: Workflow) -> str:
+        """Index a workflow and return the canonical key of its duplicate group.
+
+        If a near-duplicate is already indexed, the new workflow joins that
+        workflow's group; otherwise it becomes the canonical one itself.
+        """
+        signature = self.signature(workflow)
+        matches = self.query(signature=signature)
+        self.add(key, signature=signature)
+        if matches:
+            self._canonical[key] = self._canonical.get(matches[0][0], matches[0][0])
+        return self._canonical[key]
+
+    def canonical(self, key: str) -> str:
+        """Canonical key of an indexed workflow's duplicate group."""
+        return self._canonical.get(key, key)
+
+    def add_many(self, workflows: Iterable[Workflow]) -> dict[str, str]:
+        """Index workflows by ID; returns workflow ID -> canonical workflow ID."""
+        return {
+            workflow.workflow_id: self.add_or_match(workflow.workflow_id, workflow)
+            for workflow in workflows
+        }
@@ -0,0 +1,179 @@
+"""
+Workflow Filter module.
+Row predicates pushed down into workflow loading.
+
+A WorkflowFilter is compiled against a CSV header into a check on the raw
+csv.reader row, so rows outside the requested domains, event types, time
+window or workflow IDs are dropped before any WorkflowEvent is built or any
+JSON data cell is decoded. Workflows left without rows are never created.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Sequence
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from .workflow_loader import WorkflowEvent, _RowMapper
+
+
+def _to_millis(value: "int | float | datetime | None") -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+# Verdicts kept per filter before the URL cache is cleared
+_DOMAIN_CACHE_SIZE = 4096
+
+
+@dataclass
+class WorkflowFilter:
+    """Which events to keep when loading workflows.
+
+    Every criterion left as None matches everything. Timestamps are epoch
+    milliseconds (or datetimes), kept when since <= timestamp < until. A
+    domain also matches its subdomains, so "example.com" keeps
+    "www.example.com".
+    """
+
+    domains: Optional[Iterable[str]] = None
+    since: "int | float | datetime | None" = None
+    until: "int | float | datetime | None" = None
+    event_types: Optional[Iterable[str]] = None
+    workflow_ids: Optional[Iterable[str]] = None
+
+    # since/until as epoch milliseconds
+    _since: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _until: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # Verdict per URL; exports repeat the same few URLs on thousands of rows
+    _domain_cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.domains is not None:
+            self.domains = frozenset(d.lower().strip(".") for d in self.domains)
+        if self.event_types is not None:
+            self.event_types = frozenset(self.event_types)
+        if self.workflow_ids is not None:
+            self.workflow_ids = frozenset(str(w) for w in self.workflow_ids)
+        self._since = _to_millis(self.since)
+        self._until = _to_millis(self.until)
+
+    def matches_url(self, url: Optional[str]) -> bool:
+        """Check a URL's host against the domain list."""
+        if self.domains is None:
+            return True
+        verdict = self._domain_cache.get(url)
+        if verdict is None:
+            try:
+                host = (urlsplit(url).hostname or "") if url else ""
+            except ValueError:
+                host = ""
+            verdict = any(host == d or host.endswith("." + d) for d in self.domains)
+            if len(self._domain_cache) >= _DOMAIN_CACHE_SIZE:
+                # Long sessions can visit unbounded distinct URLs
+                self._domain_cache.clear()
+            self._domain_cache[url] = verdict
+        return verdict
+
+    def matches_timestamp(self, timestamp: int) -> bool:
+        if self._since is not None and timestamp < self._since:
+            return False
+        return self._until is None or timestamp < self._until
+
+    def matches(self, workflow_id: str, event: "WorkflowEvent") -> bool:
+        """Check an already built event."""
+        return (
+            (self.workflow_ids is None or workflow_id in self.workflow_ids)
+            and (self.event_types is None or event.event_type in self.event_types)
+            and self.matches_timestamp(event.timestamp)
+            and self.matches_url(event.url)
+        )
+
+    def compile(
+        self,
+        mapper: "_RowMapper",
+        on_reject: Optional[Callable[[str], object]] = None,
+    ) -> Callable[[Sequence], bool]:
+        """Build a predicate over raw rows laid out like the mapper's header.
+
+        on_reject, if given, is called with the workflow ID of every rejected
+        row (cheap to read), so callers can keep first-appearance order.
+        """
+        from .workflow_loader import _parse_timestamp
+
+        id_check = None
+        if self.workflow_ids is not None:
+            workflow_id_of = mapper.workflow_id
+            workflow_ids = self.workflow_ids
+            # Read the ID like the mapper does, before the row is realigned
+            id_check = lambda row: str(workflow_id_of(row)) in workflow_ids
+
+        # Checks on the aligned row, cheapest first; a missing column is
+        # judged once on the value the mapper would fill in
+        checks = []
+        if self.event_types is not None:
+            event_types = self.event_types
+            if mapper.event_index is None:
+                if "unknown" not in event_types:
+                    return self._reject_all(mapper, on_reject)
+            else:
+                event_index = mapper.event_index
+                checks.append(lambda row: row[event_index] in event_types)
+
+        if self._since is not None or self._until is not None:
+            if mapper.timestamp_index is None:
+                if not self.matches_timestamp(0):
+                    return self._reject_all(mapper, on_reject)
+            else:
+                timestamp_index = mapper.timestamp_index
+                in_window = self.matches_timestamp
+                checks.append(lambda row: in_window(_parse_timestamp(row[timestamp_index])))
+
+        if self.domains is not None:
+            if mapper.url_index is None:
+                if not self.matches_url(""):
+                    return self._reject_all(mapper, on_reject)
+            else:
+                url_index = mapper.url_index
+                matches_url = self.matches_url
+                checks.append(lambda row: matches_url(row[url_index]))
+
+        align = mapper.align
+
+        def predicate(row: Sequence) -> bool:
+            if id_check is not None and not id_check(row):
+                return False
+            if checks:
+                aligned = align(row)
+                for check in checks:
+                    if not check(aligned):
+                        return False
+            return True
+
+        if on_reject is None:
+            return predicate
+
+        workflow_id_of = mapper.workflow_id
+
+        def reporting_predicate(row: Sequence) -> bool:
+            if predicate(row):
+                return True
+            on_reject(str(workflow_id_of(row)))
+            return False
+
+        return reporting_predicate
+
+    @staticmethod
+    def _reject_all(mapper: "_RowMapper", on_reject: Optional[Callable[[str], object]]) -> Callable[[Sequence], bool]:
+        if on_reject is None:
+            return lambda row: False
+        workflow_id_of = mapper.workflow_id
+
+        def reject(row: Sequence) -> bool:
+            on_reject(str(workflow_id_of(row)))
+            return False
+
+        return reject
@@ -0,0 +1,101 @@
+"""
+Workflow Follower module.
+Incrementally ingests a CSV export that is still being appended to.
+
+The extension re-exports by appending rows to the same file. Instead of
+re-running WorkflowLoader.load() over the whole file, a follower remembers the
+byte offset of the last complete record it parsed plus any trailing partial
+record, and on each poll() parses only the newly appended rows.
+"""
+
+import csv
+import io
+import os
+from pathlib import Path
+from typing import Optional
+
+from .csv_records import complete_prefix
+from .workflow_loader import Workflow, WorkflowEvent, _RowMapper
+
+
+class WorkflowFollower:
+    """Tails a growing CSV export and keeps Workflow objects up to date."""
+
+    def __init__(self, csv_path: Path | str, columnar: bool = False, recover_title_commas: bool = False):
+        self.csv_path = Path(csv_path)
+        self.columnar = columnar
+        self.recover_title_commas = recover_title_commas
+        self.workflows: dict[str, Workflow] = {}
+
+        # Bytes up to here have been parsed into workflows
+        self.committed_offset = 0
+        # Bytes read past committed_offset that do not form a complete record yet
+        self._partial = b""
+        self._mapper: Optional[_RowMapper] = None
+
+    def reset(self) -> None:
+        """Forget everything and start again from the beginning of the file."""
+        self.workflows = {}
+        self.committed_offset = 0
+        self._partial = b""
+        self._mapper = None
+
+    def poll(self) -> list[Workflow]:
+        """Parse rows appended since the last poll.
+
+        Returns the workflows that received new events, in the order they
+        first appear in the file. If the file shrank (it was rewritten rather
+        than appended to), state is reset and the file is read from the start.
+        """
+        try:
+            size = os.path.getsize(self.csv_path)
+        except OSError:
+            return []
+
+        read_from = self.committed_offset + len(self._partial)
+        if size < read_from:
+            self.reset()
+            read_from = 0
+        if size == read_from:
+            return []
+
+        with open(self.csv_path, "rb") as f:
+            f.seek(read_from)
+            buf = self._partial + f.read(size - read_from)
+
+        end = complete_prefix(buf)
+        self._partial = buf[end:]
+        if end == 0:
+            return []
+        self.committed_offset += end
+
+        reader = csv.reader(io.StringIO(buf[:end].decode("utf-8"), newline=None))
+        if self._mapper is None:
+            header = next(reader, None)
+            if header is None:
+                return []
+            self._mapper = _RowMapper(header, self.recover_title_commas)
+
+        new_events: dict[str, list[WorkflowEvent]] = {}
+        for workflow_id, event in map(self._mapper, filter(None, reader)):
+            if workflow_id not in new_events:
+                new_events[workflow_id] = []
+            new_events[workflow_id].append(event)
+
+        updated = []
+        for workflow_id, events in new_events.items():
+            workflow = self.workflows.get(workflow_id)
+            if workflow is None:
+                workflow = self.workflows[workflow_id] = Workflow(
+                    workflow_id=workflow_id,
+                    events=self._new_events(),
+                )
+            workflow.extend(events)
+            updated.append(workflow)
+        return updated
+
+    def _new_events(self):
+        if self.columnar:
+            from .event_table import EventTable
+            return EventTable()
+        return []
@@ -0,0 +1,145 @@
+"""
+Workflow Index module.
+Persists a sidecar index of workflow_id -> byte ranges for a CSV export so a
+single workflow can be read without parsing the rest of the file.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .csv_records import iter_records, parse_record
+
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".idx.json"
+
+
+@dataclass
+class WorkflowIndex:
+    """Byte ranges of every workflow in a CSV file, keyed on the file's size and mtime."""
+
+    csv_path: Path
+    size: int
+    mtime_ns: int
+    header_end: int
+    # Workflow IDs in first-appearance order -> list of [start, end) byte ranges
+    ranges: dict[str, list[list[int]]] = field(default_factory=dict)
+
+    @staticmethod
+    def path_for(csv_path: Path) -> Path:
+        """Get the sidecar path used for a CSV file."""
+        return csv_path.with_name(csv_path.name + INDEX_SUFFIX)
+
+    @classmethod
+    def build(cls, csv_path: Path) -> "WorkflowIndex":
+        """Scan a CSV file once and record where each workflow's rows live."""
+        stat = os.stat(csv_path)
+        ranges: dict[str, list[list[int]]] = {}
+
+        with open(csv_path, "rb") as f:
+            records = iter_records(f)
+            header = next(records, None)
+            if header is None:
+                return cls(csv_path, stat.st_size, stat.st_mtime_ns, 0, ranges)
+
+            header_fields = parse_record(header[1])
+            header_end = header[0] + len(header[1])
+            # Later duplicate columns win, as with csv.DictReader
+            id_column = {name: i for i, name in enumerate(header_fields)}.get("workflow_id")
+
+            for start, record in records:
+                if not record.strip():
+                    continue
+                end = start + len(record)
+
+                if id_column is None:
+                    workflow_id = "default"
+                else:
+                    values = parse_record(record)
+                    # Mirror csv.DictReader, which fills missing columns with None
+                    workflow_id = values[id_column] if id_column < len(values) else "None"
+
+                spans = ranges.get(workflow_id)
+                if spans is None:
+                    ranges[workflow_id] = [[start, end]]
+                elif spans[-1][1] == start:
+                    # Contiguous with the previous row, extend the range
+                    spans[-1][1] = end
+                else:
+                    spans.append([start, end])
+
+        return cls(csv_path, stat.st_size, stat.st_mtime_ns, header_end, ranges)
+
+    @classmethod
+    def load(cls, csv_path: Path) -> Optional["WorkflowIndex"]:
+        """Load the sidecar index if it exists and still matches the CSV file."""
+        index_path = cls.path_for(csv_path)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            stat = os.stat(csv_path)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if (
+            payload.get("version") != INDEX_VERSION
+            or payload.get("size") != stat.st_size
+            or payload.get("mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+
+        return cls(
+            csv_path=csv_path,
+            size=payload["size"],
+            mtime_ns=payload["mtime_ns"],
+            header_end=payload["header_end"],
+            ranges=payload["ranges"],
+        )
+
+    def save(self) -> None:
+        """Write the index next to the CSV file. Failures are ignored."""
+        payload = {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "header_end": self.header_end,
+            "ranges": self.ranges,
+        }
+        index_path = self.path_for(self.csv_path)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # A read-only directory just means we rebuild the index next time
+            pass
+
+    @classmethod
+    def load_or_build(cls, csv_path: Path) -> "WorkflowIndex":
+        """Return a fresh index for the CSV file, building and saving it if needed."""
+        index = cls.load(csv_path)
+        if index is None:
+            index = cls.build(csv_path)
+            index.save()
+        return index
+
+    @property
+    def workflow_ids(self) -> list[str]:
+        """Workflow IDs in the order they first appear in the file."""
+        return list(self.ranges)
+
+    def read_workflow(self, workflow_id: str) -> str:
+        """Read the header plus only the rows belonging to one workflow."""
+        with open(self.csv_path, "rb") as f:
+            chunks = [f.read(self.header_end)]
+            for start, end in self.ranges[workflow_id]:
+                f.seek(start)
+                chunk = f.read(end - start)
+                if not chunk.endswith(b"\n"):
+                    chunk += b"\n"
+                chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8")
@@ -4,10 +4,69 @@ Parses CSV exports from the Task Mining extension and extracts workflow data.
 """
 
 import csv
+import gc
+import heapq
+import io
 import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
+from itertools import starmap
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import IO, TYPE_CHECKING, Callable, ClassVar, Iterable, Iterator, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .compressed import detect_compression, open_text
+from .csv_engines import EngineError, read_rows, resolve_engine
+from .csv_records import split_byte_ranges
+from .workflow_index import WorkflowIndex
+
+if TYPE_CHECKING:
+    from .event_table import EventTable
+    from .json_loader import JsonWorkflowLoader
+    from .workflow_filter import WorkflowFilter
+    from .workflow_cache import WorkflowCache
+    from .workflow_follower import WorkflowFollower
+
+# Range of EventTable's int64 timestamp column; parsed timestamps are clamped to it
+_TIMESTAMP_MIN = -(2 ** 63)
+_TIMESTAMP_MAX = 2 ** 63 - 1
+
+# Offset applied to timestamps in spill keys so negative values still sort as text
+_SPILL_TS_OFFSET = 2 ** 63
+
+# Target size of the byte ranges large files are split into for load_many()
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Prompt tokens Workflow.summary may spend on event lines
+DEFAULT_SUMMARY_TOKEN_BUDGET = 400
+
+# Event types that can appear in a summary
+SUMMARY_EVENTS = frozenset({"click", "input", "navigation", "page_visit", "submit", "form_submit"})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini-style tokenizers (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _url_host(url: str) -> str:
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+def _dwell_points(dwell_ms: int) -> int:
+    """Salience for the time spent after an event (reading, thinking, waiting)."""
+    if dwell_ms >= 30_000:
+        return 3
+    if dwell_ms >= 10_000:
+        return 2
+    return 1 if dwell_ms >= 3_000 else 0
 
 
 @dataclass
@@ -52,131 +111,861 @@ class Workflow:
     """Represents a complete workflow session."""
     
     workflow_id: str
-    events: list[WorkflowEvent] = field(default_factory=list)
+    # Either a plain list or a columnar EventTable; both yield WorkflowEvents
+    events: "list[WorkflowEvent] | EventTable" = field(default_factory=list)
+    
+    summary_token_budget: ClassVar[int] = DEFAULT_SUMMARY_TOKEN_BUDGET
+    
+    # start_url/summary state, valid while _cached_len == len(events)
+    _cached_len: int = field(default=-1, init=False, repr=False, compare=False)
+    _start_url: str = field(default="", init=False, repr=False, compare=False)
+    # [timestamp, event, points, dwell ms] for every event that may go into the summary
+    _candidates: list[list] = field(default_factory=list, init=False, repr=False, compare=False)
+    # Last candidate, whose dwell is only known once the next event arrives
+    _awaiting_dwell: Optional[list] = field(default=None, init=False, repr=False, compare=False)
+    _host: str = field(default="", init=False, repr=False, compare=False)
+    _last_action: tuple = field(default=(), init=False, repr=False, compare=False)
+    _summary_key: tuple = field(default=(), init=False, repr=False, compare=False)
+    _summary: str = field(default="", init=False, repr=False, compare=False)
+    _summary_truncated: bool = field(default=False, init=False, repr=False, compare=False)
     
     @property
     def start_url(self) -> str:
         """Get the starting URL of this workflow."""
-        for event in self.events:
-            if event.url:
-                return event.url
-        return ""
+        self._refresh()
+        return self._start_url
     
     @property
     def summary(self) -> str:
         """Generate a summary of the workflow actions."""
-        # Filter out noise events
-        significant_events = [
-            e for e in self.events 
-            if e.event_type in ("click", "input", "navigation", "page_visit")
+        return self.summarize()
+    
+    @property
+    def summary_truncated(self) -> bool:
+        """Whether the summary had to leave out events to stay within its token budget."""
+        self.summarize()
+        return self._summary_truncated
+    
+    def summarize(self, token_budget: Optional[int] = None) -> str:
+        """Summarize the most salient actions, in order, within a token budget.
+        
+        Every candidate event is scored in one pass over the workflow: inputs
+        and form submits score highest, then moves to another site, clicks
+        and plain navigation, plus points for the dwell time before the next
+        event and for being the first or last action. Repeats of the previous
+        action (e.g. one input event per keystroke) score nothing. Scores are small
+        integers, so events are ranked with a counting sort and the budget is
+        filled from the top without sorting the whole session.
+        """
+        self._refresh()
+        budget = self.summary_token_budget if token_budget is None else token_budget
+        key = (self._cached_len, budget)
+        if self._summary_key == key:
+            return self._summary
+        
+        candidates = self._candidates
+        last = len(candidates) - 1
+        buckets: list[list[int]] = [[] for _ in range(16)]
+        for i, (_, _, points, dwell) in enumerate(candidates):
+            score = points + _dwell_points(dwell)
+            if i == 0 or i == last:
+                score += 3
+            buckets[min(score, 15)].append(i)
+        
+        descriptions: dict[int, str] = {}
+        used = 0
+        for bucket in reversed(buckets):
+            for i in bucket:
+                description = candidates[i][1].description
+                cost = estimate_tokens(description) + 1
+                if used + cost <= budget:
+                    descriptions[i] = description
+                    used += cost
+            if budget - used < 4:
+                break
+        
+        lines = [descriptions[i] for i in range(len(candidates)) if i in descriptions]
+        self._summary = "\n".join(f"{i+1}. {desc}" for i, desc in enumerate(lines))
+        self._summary_truncated = len(lines) < len(candidates)
+        self._summary_key = key
+        return self._summary
+    
+    def extend(self, new_events: Iterable[WorkflowEvent]) -> None:
+        """Append events, updating start_url and summary incrementally.
+        
+        Events that arrive in timestamp order (the common case when a recording
+        is appended to) only touch the new events. Out-of-order events re-sort
+        the workflow and the derived state is rebuilt on next access.
+        """
+        new_events = sorted(new_events, key=lambda e: e.timestamp)
+        if not new_events:
+            return
+        
+        in_order = not self.events or new_events[0].timestamp >= self.events[-1].timestamp
+        up_to_date = self._cached_len == len(self.events)
+        self.events.extend(new_events)
+        
+        if not in_order:
+            if isinstance(self.events, list):
+                self.events.sort(key=lambda e: e.timestamp)
+            else:
+                self.events.sort_by_timestamp()
+            self._cached_len = -1
+        elif up_to_date:
+            self._scan(new_events)
+            self._cached_len = len(self.events)
+    
+    def _refresh(self) -> None:
+        """Recompute start_url/summary state if events changed behind our back."""
+        if self._cached_len != len(self.events):
+            self._start_url = ""
+            self._candidates = []
+            self._awaiting_dwell = None
+            self._host = ""
+            self._last_action = ()
+            self._scan(self.events)
+            self._cached_len = len(self.events)
+    
+    def _scan(self, events: Iterable[WorkflowEvent]) -> None:
+        """Fold events into the start URL and the scored summary candidates."""
+        for event in events:
+            if not self._start_url and event.url:
+                self._start_url = event.url
+            
+            waiting = self._awaiting_dwell
+            if waiting is not None:
+                waiting[3] = event.timestamp - waiting[0]
+                self._awaiting_dwell = None
+            
+            event_type = event.event_type
+            # Filter out noise events
+            if event_type not in SUMMARY_EVENTS:
+                continue
+            
+            if event_type == "input":
+                points = 5
+            elif event_type in ("submit", "form_submit"):
+                points = 6
+            elif event_type == "click":
+                points = 2
+                if event.data.get("input_type") == "submit" or "submit" in str(event.data.get("element_type") or "").lower():
+                    points = 6
+            else:
+                points = 1
+                host = _url_host(event.url)
+                if host and host != self._host:
+                    if self._host:
+                        points = 4  # Moved to another site
+                    self._host = host
+            
+            action = (event_type, event.url, event.data.get("field_name"), event.data.get("text"))
+            if action == self._last_action:
+                points = 0
+            self._last_action = action
+            
+            entry = [event.timestamp, event, points, 0]
+            self._candidates.append(entry)
+            self._awaiting_dwell = entry
+
+
+def _parse_timestamp(value) -> int:
+    """Parse a timestamp cell that might be a string, float or int.
+
+    Values beyond int64, the width of EventTable's timestamp column, are
+    clamped to its range.
+    """
+    if not value:
+        return 0
+    try:
+        # Exports almost always hold integer milliseconds
+        timestamp = int(value)
+    except (ValueError, TypeError):
+        try:
+            timestamp = int(float(value))
+        except (ValueError, TypeError, OverflowError):
+            return 0
+    if _TIMESTAMP_MIN <= timestamp <= _TIMESTAMP_MAX:
+        return timestamp
+    return _TIMESTAMP_MIN if timestamp < 0 else _TIMESTAMP_MAX
+
+
+# Sort key for WorkflowEvent field tuples
+_timestamp_of = itemgetter(1)
+
+
+def _tuple_getter(indices: list[int]):
+    """itemgetter that always returns a tuple, even for a single index."""
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda row: (row[index],)
+    return itemgetter(*indices)
+
+
+class _RowMapper:
+    """Header -> event field plan, compiled once per file.
+    
+    The extension exports nested events with flattened keys like
+    'data.element_type' or 'data.dom_context.parent'. Column positions and
+    the nested path of every 'data.*' column are worked out from the header
+    once, then applied to each csv.reader row by index.
+    
+    With recover_title_commas, a row with more fields than the header is
+    assumed to have unquoted commas in its title, and the surplus fields are
+    joined back into the title instead of shifting every later column.
+    """
+    
+    def __init__(self, header: list[str], recover_title_commas: bool = False):
+        self.width = len(header)
+        # Later duplicate columns win and empty names are skipped, as with csv.DictReader
+        columns = {name: i for i, name in enumerate(header) if name}
+        
+        self.workflow_id_index = columns.get("workflow_id")
+        self.event_index = columns.get("event", columns.get("event_type"))
+        self.timestamp_index = columns.get("timestamp")
+        self.url_index = columns.get("url")
+        self.title_index = columns.get("title")
+        self.json_data_index = columns.get("data")
+        # Column that surplus fields are joined back into; None when not recovering
+        self.recover_index = self.title_index if recover_title_commas else None
+        
+        # Nested path of every flattened data column, in header order
+        self.data_paths = [
+            (i, tuple(name[5:].split(".")))
+            for name, i in columns.items()
+            if name.startswith("data.")
         ]
+        self.flat_data = all(len(path) == 1 for _, path in self.data_paths)
+        if self.data_paths and self.flat_data:
+            self.flat_keys = tuple(path[0] for _, path in self.data_paths)
+            self.flat_getter = _tuple_getter([i for i, _ in self.data_paths])
+    
+    def workflow_id(self, row: Sequence) -> str:
+        """Get the workflow ID of a row without building its event."""
+        if self.workflow_id_index is None:
+            return "default"
+        index = self.workflow_id_index
+        recover_index = self.recover_index
+        if recover_index is not None and len(row) > self.width and index > recover_index:
+            index += len(row) - self.width
+        if index < len(row):
+            return row[index]
+        # csv.DictReader fills short rows with None
+        return "None"
+    
+    def align(self, row: Sequence) -> Sequence:
+        """Bring a ragged row to the header's width."""
+        if len(row) < self.width:
+            return [*row, *([None] * (self.width - len(row)))]
+        if len(row) > self.width and self.recover_index is not None:
+            return self._rejoin_title(row, self.recover_index)
+        return row
+    
+    def __call__(self, row: Sequence) -> tuple[str, WorkflowEvent]:
+        """Convert one csv.reader row into its workflow ID and a WorkflowEvent."""
+        workflow_id, fields = self.fields(row)
+        return workflow_id, WorkflowEvent(*fields)
+    
+    def fields(self, row: Sequence) -> tuple[str, tuple[str, int, str, str, dict]]:
+        """Workflow ID and the WorkflowEvent fields of a row, in constructor order."""
+        if len(row) != self.width:
+            row = self.align(row)
+        
+        # Get workflow ID - extension uses numeric IDs like "1", "2"
+        workflow_id = "default" if self.workflow_id_index is None else str(row[self.workflow_id_index])
+        
+        if self.data_paths:
+            data = self._nest_data(row)
+        elif self.json_data_index is not None:
+            # The data field is a JSON string
+            data = row[self.json_data_index]
+            try:
+                data = json.loads(data) if data else {}
+            except json.JSONDecodeError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+        else:
+            data = {}
+        
+        return workflow_id, (
+            "unknown" if self.event_index is None else row[self.event_index],
+            0 if self.timestamp_index is None else _parse_timestamp(row[self.timestamp_index]),
+            "" if self.url_index is None else row[self.url_index],
+            "" if self.title_index is None else row[self.title_index],
+            data,
+        )
+    
+    def _rejoin_title(self, row: Sequence, start: int) -> list:
+        """Merge the fields an unquoted title was split into back into one."""
+        end = start + len(row) - self.width + 1
+        return [*row[:start], ",".join(row[start:end]), *row[end:]]
+    
+    def _nest_data(self, row: Sequence) -> dict:
+        """Rebuild the nested data dict from the flattened 'data.*' columns."""
+        if self.flat_data:
+            return dict(zip(self.flat_keys, self.flat_getter(row)))
+        
+        data: dict = {}
+        for i, path in self.data_paths:
+            node = data
+            for key in path[:-1]:
+                child = node.get(key)
+                if child is None:
+                    child = node[key] = {}
+                elif not isinstance(child, dict):
+                    # A scalar already lives at this prefix; keep it
+                    break
+                node = child
+            else:
+                node[path[-1]] = row[i]
+        return data
+
+
+def _iter_row_events(
+    f: IO[str],
+    recover_title_commas: bool = False,
+    where: Optional["WorkflowFilter"] = None,
+    on_reject: Optional[Callable[[str], object]] = None,
+) -> Iterator[tuple[str, WorkflowEvent]]:
+    """Yield (workflow ID, event) for every row of an open CSV file."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Blank lines are skipped, like csv.DictReader does
+    mapper = _RowMapper(header, recover_title_commas)
+    yield from _map_rows(mapper, filter(None, reader), where, on_reject)
+
+
+def _map_rows(
+    mapper: _RowMapper,
+    rows: Iterable[Sequence],
+    where: Optional["WorkflowFilter"] = None,
+    on_reject: Optional[Callable[[str], object]] = None,
+) -> Iterator[tuple[str, WorkflowEvent]]:
+    """Turn raw rows into events, dropping rows the filter rejects before building them."""
+    if where is not None:
+        rows = filter(where.compile(mapper, on_reject), rows)
+    return map(mapper, rows)
+
+
+def _encode_spill_line(order: int, seq: int, workflow_id: str, event: WorkflowEvent) -> str:
+    """Serialize an event for an external sort run.
+    
+    The fixed-width prefix (workflow order, timestamp, row number) makes plain
+    string comparison equal to the ordering load() produces. The timestamp
+    in the prefix is clamped to int64 so it always fits its 20 digits; the
+    payload keeps the exact value.
+    """
+    payload = json.dumps([workflow_id, event.event_type, event.timestamp, event.url, event.title, event.data])
+    sort_ts = min(max(event.timestamp, _TIMESTAMP_MIN), _TIMESTAMP_MAX) + _SPILL_TS_OFFSET
+    return f"{order:012d}{sort_ts:020d}{seq:015d}{payload}\n"
+
+
+def _decode_spill_line(line: str) -> tuple[str, WorkflowEvent]:
+    """Inverse of _encode_spill_line."""
+    workflow_id, event_type, timestamp, url, title, data = json.loads(line[47:])
+    return workflow_id, WorkflowEvent(
+        event_type=event_type,
+        timestamp=timestamp,
+        url=url,
+        title=title,
+        data=data,
+    )
+
+
+def _spill_run(stack: ExitStack, lines: list[str]) -> IO[str]:
+    """Sort a run of spill lines and write it to a temporary file."""
+    lines.sort()
+    run = stack.enter_context(tempfile.TemporaryFile("w+", encoding="utf-8"))
+    run.writelines(lines)
+    run.seek(0)
+    return run
+
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while building many small objects.
+    
+    Bulk ingest allocates millions of dicts and events that are never
+    garbage; letting the collector scan them repeatedly dominates load time.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _share_strings(rows: list[tuple]) -> list[tuple]:
+    """Make equal strings in WorkflowEvent field tuples the same object.
+    
+    Pickle writes an object it has already seen as a back-reference, so a URL
+    or data value repeated on thousands of rows is sent (and rebuilt by the
+    parent process) once.
+    """
+    shared: dict[str, str] = {}
+    share = shared.setdefault
+    result = []
+    for event_type, timestamp, url, title, data in rows:
+        data = {
+            key: share(value, value) if isinstance(value, str) else value
+            for key, value in data.items()
+        }
+        result.append((share(event_type, event_type), timestamp, share(url, url), share(title, title), data))
+    return result
+
+
+def _load_byte_range(
+    path: str,
+    header_end: int,
+    start: int,
+    end: Optional[int],
+    recover_title_commas: bool = False,
+    columnar: bool = False,
+    share_strings: bool = False,
+) -> list[tuple[str, "list[tuple] | EventTable"]]:
+    """Parse one record-aligned byte range of a CSV file (process pool worker).
+    
+    An end of None means the whole file, which is how compressed exports
+    (that cannot be split by byte offset) are handed over. Workflows come
+    back in first-appearance order with their rows timestamp-sorted, as an
+    EventTable each when columnar and otherwise as lists of WorkflowEvent
+    field tuples; both pickle far cheaper than WorkflowEvent objects. Set
+    share_strings when the result crosses a process boundary.
+    """
+    from .event_table import EventTable
+    
+    if end is None:
+        text = open_text(Path(path), detect_compression(Path(path)))
+    else:
+        with open(path, "rb") as f:
+            header = f.read(header_end)
+            f.seek(start)
+            body = f.read(end - start)
+        text = io.TextIOWrapper(io.BytesIO(header + body), encoding="utf-8")
+    
+    rows_by_workflow: dict[str, list[tuple]] = {}
+    with text, _gc_paused():
+        reader = csv.reader(text)
+        header_row = next(reader, None)
+        if header_row is None:
+            return []
+        # Blank lines are skipped, like csv.DictReader does
+        fields_of = _RowMapper(header_row, recover_title_commas).fields
+        for workflow_id, fields in map(fields_of, filter(None, reader)):
+            rows = rows_by_workflow.get(workflow_id)
+            if rows is None:
+                rows = rows_by_workflow[workflow_id] = []
+            rows.append(fields)
         
-        descriptions = [e.description for e in significant_events[:20]]  # Limit to 20 actions
-        return "\n".join(f"{i+1}. {desc}" for i, desc in enumerate(descriptions))
+        parts: list[tuple[str, "list[tuple] | EventTable"]] = []
+        for workflow_id, rows in rows_by_workflow.items():
+            rows.sort(key=_timestamp_of)
+            if columnar:
+                table = EventTable()
+                for row in rows:
+                    table.add(*row)
+                parts.append((workflow_id, table))
+            else:
+                parts.append((workflow_id, _share_strings(rows) if share_strings else rows))
+    return parts
 
 
 class WorkflowLoader:
     """Loads and parses workflow data from CSV exports."""
     
-    def __init__(self, csv_path: Path | str):
+    def __init__(
+        self,
+        csv_path: Path | str,
+        use_index: bool = True,
+        use_cache: bool = True,
+        engine: str = "auto",
+        recover_title_commas: bool = False,
+    ):
         self.csv_path = Path(csv_path)
         if not self.csv_path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
+        # "gzip" or "zstd" for archived exports, which are decompressed while parsing
+        self.compression = detect_compression(self.csv_path)
+        # Tokenizer used by load(): "stdlib", "pyarrow", "polars" or "auto" (see csv_engines)
+        self.engine = resolve_engine(engine)
+        # Join the surplus fields of over-long rows back into the title column
+        self.recover_title_commas = recover_title_commas
+        # Persist a sidecar byte-offset index so load_single() can seek to one workflow
+        self.use_index = use_index
+        # Keep a binary copy of the parsed workflows next to the CSV for instant reloads
+        self.use_cache = use_cache
     
-    def _unflatten_row(self, row: dict) -> dict:
-        """Convert flattened dot-notation keys back to nested structure.
+    def _cache(self) -> "WorkflowCache":
+        from .workflow_cache import WorkflowCache
+        return WorkflowCache(self.csv_path, {"recover_title_commas": self.recover_title_commas})
+    
+    def _read_cache(self, columnar: bool, where: Optional["WorkflowFilter"] = None) -> Optional[list[Workflow]]:
+        """Load workflows from a fresh binary cache, or None on a miss."""
+        workflow_ids = None
+        if where is not None and where.workflow_ids is not None:
+            workflow_ids = set(where.workflow_ids)
+        cached = self._cache().read(workflow_ids)
+        if cached is None:
+            return None
+        if where is None:
+            with _gc_paused():
+                return [
+                    Workflow(workflow_id=wf_id, events=table if columnar else table.to_list())
+                    for wf_id, table in cached
+                ]
         
-        The extension exports with flattened keys like 'data.element_type'.
-        This converts them back to nested dicts like {'data': {'element_type': ...}}.
-        """
-        result = {}
-        data = {}
+        workflows = []
+        with _gc_paused():
+            for wf_id, table in cached:
+                events = [event for event in table.to_list() if where.matches(wf_id, event)]
+                if not events:
+                    continue
+                if columnar:
+                    from .event_table import EventTable
+                    events = EventTable(events)
+                workflows.append(Workflow(workflow_id=wf_id, events=events))
+        return workflows
+    
+    def load(self, columnar: bool = False, where: Optional["WorkflowFilter"] = None) -> list[Workflow]:
+        """Load all workflows from the CSV file.
         
-        for key, value in row.items():
-            # Skip None or empty keys
-            if not key:
-                continue
-                
-            if key.startswith("data."):
-                # Extract the nested key
-                nested_key = key[5:]  # Remove 'data.' prefix
-                if "." in nested_key:
-                    # Handle deeper nesting like data.dom_context.parent
-                    parts = nested_key.split(".", 1)
-                    if parts[0] not in data:
-                        data[parts[0]] = {}
-                    if isinstance(data[parts[0]], dict):
-                        data[parts[0]][parts[1]] = value
-                else:
-                    data[nested_key] = value
-            elif key.startswith("viewport."):
-                # Handle viewport separately
-                if "viewport" not in result:
-                    result["viewport"] = {}
-                result["viewport"][key[9:]] = value
-            else:
-                result[key] = value
+        With use_cache enabled, the parsed result is written to a binary cache
+        next to the CSV and later calls read that instead of the text.
         
-        # Add data dict if it has content
-        if data:
-            result["data"] = data
+        Args:
+            columnar: Store each workflow's events in a compact EventTable
+                instead of a list of WorkflowEvent objects.
+            where: Only keep events matching this WorkflowFilter. Rows are
+                checked before they are turned into events, and workflows
+                with no matching rows are left out.
+        """
+        if self.use_cache:
+            workflows = self._read_cache(columnar, where)
+            if workflows is not None:
+                return workflows
         
-        return result
-    
-    def load(self) -> list[Workflow]:
-        """Load all workflows from the CSV file."""
-        events_by_workflow: dict[str, list[WorkflowEvent]] = {}
+        # A filtered result is only part of the file, so it is not cached
+        snapshot = self._cache().snapshot() if self.use_cache and where is None else None
         
-        with open(self.csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                # Unflatten the row if it has dot-notation keys
-                has_dot_keys = any("." in k for k in row.keys())
-                if has_dot_keys:
-                    row = self._unflatten_row(row)
-                
-                # Get workflow ID - extension uses numeric IDs like "1", "2"
-                workflow_id = str(row.get("workflow_id", "default"))
-                
-                # Parse the data field if it's still a JSON string
-                data = row.get("data", {})
-                if isinstance(data, str):
-                    try:
-                        data = json.loads(data) if data else {}
-                    except json.JSONDecodeError:
-                        data = {}
-                
-                # Handle timestamp - might be string or int
-                timestamp_val = row.get("timestamp", 0)
-                try:
-                    timestamp = int(float(timestamp_val)) if timestamp_val else 0
-                except (ValueError, TypeError):
-                    timestamp = 0
-                
-                event = WorkflowEvent(
-                    event_type=row.get("event", row.get("event_type", "unknown")),
-                    timestamp=timestamp,
-                    url=row.get("url", ""),
-                    title=row.get("title", ""),
-                    data=data if isinstance(data, dict) else {},
-                )
-                
-                if workflow_id not in events_by_workflow:
-                    events_by_workflow[workflow_id] = []
-                events_by_workflow[workflow_id].append(event)
+        if columnar:
+            from .event_table import EventTable
+            new_events = EventTable
+        else:
+            new_events = list
+        events_by_workflow: dict = {}
+        # Rejected rows still claim their workflow's slot so the result keeps
+        # the unfiltered first-appearance order; unfilled slots stay None
+        on_reject = None if where is None else lambda wf_id: events_by_workflow.setdefault(wf_id)
+        
+        with _gc_paused():
+            for workflow_id, event in self._iter_file_events(where, on_reject):
+                events = events_by_workflow.get(workflow_id)
+                if events is None:
+                    events = events_by_workflow[workflow_id] = new_events()
+                events.append(event)
         
         # Create Workflow objects
         workflows = []
         for wf_id, events in events_by_workflow.items():
+            if events is None:
+                continue
             # Sort events by timestamp
-            events.sort(key=lambda e: e.timestamp)
+            if columnar:
+                events.sort_by_timestamp()
+            else:
+                events.sort(key=lambda e: e.timestamp)
             workflows.append(Workflow(workflow_id=wf_id, events=events))
         
+        if snapshot is not None:
+            self._cache().write(workflows, snapshot)
+        
         return workflows
     
+    def _iter_file_events(
+        self,
+        where: Optional["WorkflowFilter"] = None,
+        on_reject: Optional[Callable[[str], object]] = None,
+    ) -> Iterator[tuple[str, WorkflowEvent]]:
+        """Yield (workflow ID, event) for every row, tokenized by the configured engine."""
+        if self.engine != "stdlib":
+            try:
+                header, rows = read_rows(self.csv_path, self.engine, self.compression)
+            except EngineError as e:
+                # Ragged rows or an unusual header: the stdlib parser copes with both
+                print(f"{self.engine} could not parse {self.csv_path.name} ({e}), using the stdlib parser")
+            else:
+                yield from _map_rows(_RowMapper(header, self.recover_title_commas), rows, where, on_reject)
+                return
+        
+        with open_text(self.csv_path, self.compression) as f:
+            yield from _iter_row_events(f, self.recover_title_commas, where, on_reject)
+    
+    def follow(self, columnar: bool = False) -> "WorkflowFollower":
+        """Create a follower that ingests only rows appended since its last poll()."""
+        if self.compression:
+            raise ValueError(f"Cannot follow a {self.compression}-compressed export: {self.csv_path}")
+        from .workflow_follower import WorkflowFollower
+        return WorkflowFollower(self.csv_path, columnar=columnar, recover_title_commas=self.recover_title_commas)
+    
+    @classmethod
+    def load_many(
+        cls,
+        paths: Iterable[Path | str],
+        workers: Optional[int] = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        columnar: bool = False,
+        recover_title_commas: bool = False,
+    ) -> dict[Path, list[Workflow]]:
+        """Load several CSV exports in parallel on a process pool.
+        
+        Each file is split into record-aligned byte ranges of about
+        `chunk_bytes` (quoted multi-line fields never straddle a boundary),
+        so a single large file is also spread across cores (compressed
+        files are parsed whole, one per worker). Partial
+        per-workflow event lists from each range are merged in file order and
+        timestamp-sorted, giving the same result as load() on every file.
+        
+        Args:
+            paths: CSV files to load.
+            workers: Number of worker processes (defaults to the CPU count).
+                With 1 worker everything is parsed in this process.
+            chunk_bytes: Target size of each byte range.
+            columnar: Store each workflow's events in an EventTable.
+            recover_title_commas: Join the surplus fields of over-long rows
+                back into the title column.
+        
+        Returns:
+            Workflows for each input path, in the order load() would return them.
+        """
+        loaders = [cls(path, engine="stdlib") for path in paths]
+        csv_paths = [loader.csv_path for loader in loaders]
+        
+        tasks = []
+        for loader in loaders:
+            path = loader.csv_path
+            if loader.compression:
+                tasks.append((path, str(path), 0, 0, None, recover_title_commas))
+                continue
+            header_end, ranges = split_byte_ranges(path, chunk_bytes)
+            tasks.extend(
+                (path, str(path), header_end, start, end, recover_title_commas)
+                for start, end in ranges
+            )
+        
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) <= 1:
+            parts = (_load_byte_range(*task[1:], columnar=columnar) for task in tasks)
+            return cls._merge_ranges(csv_paths, tasks, parts, columnar)
+        
+        # Results are unpickled as they arrive, which the collector would
+        # otherwise keep interrupting
+        with _gc_paused(), ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            columns = zip(*(task[1:] for task in tasks))
+            parts = pool.map(
+                _load_byte_range,
+                *columns,
+                [columnar] * len(tasks),
+                [True] * len(tasks),
+            )
+            return cls._merge_ranges(csv_paths, tasks, parts, columnar)
+    
+    @staticmethod
+    def _merge_ranges(
+        csv_paths: list[Path],
+        tasks: list[tuple],
+        parts: Iterable[list[tuple[str, "list[tuple] | EventTable"]]],
+        columnar: bool,
+    ) -> dict[Path, list[Workflow]]:
+        """Combine per-range results (in task order) into sorted workflows per file.
+        
+        Each range is already sorted, so a workflow split across ranges only
+        needs its sorted runs merged; timsort does that in near-linear time.
+        """
+        merged: dict[Path, dict] = {path: {} for path in csv_paths}
+        split: set[tuple[Path, str]] = set()
+        for task, part in zip(tasks, parts):
+            pieces = merged[task[0]]
+            for workflow_id, piece in part:
+                if workflow_id not in pieces:
+                    pieces[workflow_id] = piece
+                    continue
+                if columnar:
+                    pieces[workflow_id].extend_table(piece)
+                else:
+                    pieces[workflow_id].extend(piece)
+                split.add((task[0], workflow_id))
+        
+        results: dict[Path, list[Workflow]] = {}
+        with _gc_paused():
+            for path, pieces in merged.items():
+                workflows = []
+                for wf_id, events in pieces.items():
+                    if (path, wf_id) in split:
+                        if columnar:
+                            events.sort_by_timestamp()
+                        else:
+                            events.sort(key=_timestamp_of)
+                    if not columnar:
+                        events = list(starmap(WorkflowEvent, events))
+                    workflows.append(Workflow(workflow_id=wf_id, events=events))
+                results[path] = workflows
+        return results
+    
+    def iter_workflows(
+        self,
+        grouped: Optional[bool] = None,
+        chunk_rows: int = 100_000,
+        columnar: bool = False,
+        where: Optional["WorkflowFilter"] = None,
+    ) -> Iterator[Workflow]:
+        """Yield workflows one at a time without holding the whole file in memory.
+        
+        Workflows come out in the same order and with the same events as
+        load(). If the CSV is grouped by workflow_id (every workflow's rows are
+        contiguous) rows are streamed and each workflow is yielded as soon as
+        its last row is read. Otherwise events are spilled to temporary files
+        in sorted runs of `chunk_rows` and merged back, so peak memory is
+        bounded by the run size and the largest single workflow.
+        
+        Args:
+            grouped: Skip the layout scan when the caller already knows whether
+                the file is grouped by workflow_id.
+            chunk_rows: Number of events held in memory per sorted run.
+            columnar: Yield workflows backed by an EventTable.
+            where: Only keep events matching this WorkflowFilter, as in load().
+        """
+        order = None
+        if grouped is None:
+            order, grouped = self._scan_workflow_order()
+        
+        if grouped:
+            workflows = self._iter_grouped(where)
+        else:
+            if order is None:
+                order, _ = self._scan_workflow_order()
+            workflows = self._iter_external_sort(order, chunk_rows, where)
+        
+        if columnar:
+            from .event_table import EventTable
+            for workflow in workflows:
+                workflow.events = EventTable(workflow.events)
+                yield workflow
+        else:
+            yield from workflows
+    
+    def _scan_workflow_order(self) -> tuple[dict[str, int], bool]:
+        """Return each workflow's first-appearance index and whether rows are grouped."""
+        order: dict[str, int] = {}
+        grouped = True
+        current = None
+        
+        with open_text(self.csv_path, self.compression) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return order, grouped
+            workflow_id_of = _RowMapper(header, self.recover_title_commas).workflow_id
+            
+            for row in filter(None, reader):
+                workflow_id = workflow_id_of(row)
+                if workflow_id == current:
+                    continue
+                if workflow_id in order:
+                    grouped = False
+                else:
+                    order[workflow_id] = len(order)
+                current = workflow_id
+        
+        return order, grouped
+    
+    def _iter_grouped(self, where: Optional["WorkflowFilter"] = None) -> Iterator[Workflow]:
+        """Stream a CSV whose rows are already contiguous per workflow."""
+        current_id = None
+        events: list[WorkflowEvent] = []
+        
+        with open_text(self.csv_path, self.compression) as f:
+            for workflow_id, event in _iter_row_events(f, self.recover_title_commas, where):
+                if workflow_id != current_id:
+                    if current_id is not None:
+                        events.sort(key=lambda e: e.timestamp)
+                        yield Workflow(workflow_id=current_id, events=events)
+                    current_id = workflow_id
+                    events = []
+                events.append(event)
+        
+        if current_id is not None:
+            events.sort(key=lambda e: e.timestamp)
+            yield Workflow(workflow_id=current_id, events=events)
+    
+    def _iter_external_sort(
+        self,
+        order: dict[str, int],
+        chunk_rows: int,
+        where: Optional["WorkflowFilter"] = None,
+    ) -> Iterator[Workflow]:
+        """Group an unordered CSV with an on-disk merge sort of its events."""
+        with ExitStack() as stack:
+            runs = []
+            buffer: list[str] = []
+            
+            with open_text(self.csv_path, self.compression) as f:
+                for seq, (workflow_id, event) in enumerate(_iter_row_events(f, self.recover_title_commas, where)):
+                    buffer.append(_encode_spill_line(order[workflow_id], seq, workflow_id, event))
+                    if len(buffer) >= chunk_rows:
+                        runs.append(_spill_run(stack, buffer))
+                        buffer = []
+            
+            if runs:
+                if buffer:
+                    runs.append(_spill_run(stack, buffer))
+                lines = heapq.merge(*runs)
+            else:
+                # Everything fit in a single run, no need to touch the disk
+                buffer.sort()
+                lines = iter(buffer)
+            
+            current_id = None
+            events: list[WorkflowEvent] = []
+            for line in lines:
+                workflow_id, event = _decode_spill_line(line)
+                if workflow_id != current_id:
+                    if current_id is not None:
+                        yield Workflow(workflow_id=current_id, events=events)
+                    current_id = workflow_id
+                    events = []
+                events.append(event)
+            
+            if current_id is not None:
+                yield Workflow(workflow_id=current_id, events=events)
+    
     def load_single(self, workflow_id: Optional[str] = None) -> Workflow:
-        """Load a single workflow. If workflow_id is None, returns the first workflow."""
+        """Load a single workflow. If workflow_id is None, returns the first workflow.
+        
+        A fresh binary cache is used when there is one. Otherwise, with
+        use_index enabled, a sidecar index of byte ranges per workflow
+        (built on first use) lets calls seek straight to the requested
+        workflow and parse only its rows.
+        """
+        if self.use_cache:
+            cached = self._cache().read({workflow_id} if workflow_id else None)
+            if cached is not None:
+                if cached:
+                    wf_id, table = cached[0]
+                    return Workflow(workflow_id=wf_id, events=table.to_list())
+                if workflow_id:
+                    raise ValueError(f"Workflow with ID '{workflow_id}' not found")
+                raise ValueError("No workflows found in CSV file")
+        
+        # The index locates workflow IDs by raw column position, which recovered rows do not
+        # respect, and byte offsets are meaningless inside a compressed stream
+        use_index = self.use_index and not self.recover_title_commas and not self.compression
+        if use_index:
+            return self._load_single_indexed(workflow_id)
+        
         workflows = self.load()
         
         if not workflows:
@@ -189,3 +978,36 @@ class WorkflowLoader:
             raise ValueError(f"Workflow with ID '{workflow_id}' not found")
         
         return workflows[0]
+    
+    def _load_single_indexed(self, workflow_id: Optional[str]) -> Workflow:
+        """Load one workflow by reading only its byte ranges from the CSV."""
+        index = WorkflowIndex.load_or_build(self.csv_path)
+        
+        if not index.ranges:
+            raise ValueError("No workflows found in CSV file")
+        
+        if workflow_id:
+            if workflow_id not in index.ranges:
+                raise ValueError(f"Workflow with ID '{workflow_id}' not found")
+        else:
+            workflow_id = index.workflow_ids[0]
+        
+        events = []
+        # newline=None translates line endings inside quoted values as load()'s text mode does
+        rows = io.StringIO(index.read_workflow(workflow_id), newline=None)
+        for row_workflow_id, event in _iter_row_events(rows):
+            if row_workflow_id == workflow_id:
+                events.append(event)
+        
+        events.sort(key=lambda e: e.timestamp)
+        return Workflow(workflow_id=workflow_id, events=events)
+
+
+def loader_for(path: Path | str, **kwargs) -> "WorkflowLoader | JsonWorkflowLoader":
+    """Pick the loader for an export by its extension (.csv or .json/.ndjson/.jsonl)."""
+    from .json_loader import JSON_SUFFIXES, JsonWorkflowLoader
+    path = Path(path)
+    suffixes = [s.lower() for s in path.suffixes[-2:]]
+    if any(suffix in JSON_SUFFIXES for suffix in suffixes):
+        return JsonWorkflowLoader(path)
+    return WorkflowLoader(path, **kwargs)
@@ -0,0 +1,40 @@
+"""Shared fixtures."""
+
+import pytest
+
+from automation.llm_client import LLMClient
+from automation.response_cache import ResponseCache
+
+
+class FakeChatModel:
+    """Returns canned replies in order and records the prompts it was sent."""
+
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.prompts: list[str] = []
+
+    def _reply(self, messages):
+        from langchain_core.messages import AIMessage
+
+        self.prompts.append(messages[-1].content)
+        return AIMessage(content=self.replies.pop(0))
+
+    def invoke(self, messages):
+        return self._reply(messages)
+
+    async def ainvoke(self, messages):
+        return self._reply(messages)
+
+    def bind(self, **kwargs):
+        return self
+
+
+@pytest.fixture
+def llm_client(monkeypatch):
+    """An LLMClient with an in-memory response cache and no real models."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    client = LLMClient(cache=ResponseCache(None))
+    model = FakeChatModel()
+    for name in ("llm", "llm_pro", "llm_pro_json"):
+        monkeypatch.setattr(client, name, model)
+    return client
@@ -0,0 +1,51 @@
+"""Native CSV engines must load exactly what the stdlib parser loads."""
+
+import pytest
+
+from automation.csv_engines import available_engines
+from automation.workflow_loader import WorkflowLoader
+
+HEADER = "workflow_id,event,timestamp,url,title,data.text,data.a.b"
+
+CASES = {
+    "plain": [
+        "1,click,100,https://a.com,Home,Go,x",
+        "2,input,200,https://b.com,Login,,y",
+    ],
+    "trailing_newline": ["1,click,100,https://a.com,Home,Go,x", ""],
+    "blank_lines": ["1,click,100,https://a.com,Home,Go,x", "", "", "1,click,200,https://a.com,Home,Go,x", ""],
+    "short_rows": ["1,click,100,https://a.com", "1,input", "2,click,300,https://b.com,T,text,z"],
+    "empty_last_column": ["1,click,100,https://a.com,Home,Go,", "1,click,200,https://a.com,Home,Go,x"],
+    "quoted_crlf": ['1,click,100,"https://a.com","Two\r\nlines","a\r\nb","c\nd"'],
+    "quoted_commas": ['1,click,100,https://a.com,"Shop, Cart","x ""y""",z'],
+    "long_row": ["1,click,100,https://a.com,Shop, Cart,Go,x"],
+}
+
+NATIVE = [engine for engine in ("pyarrow", "polars") if engine in available_engines()]
+
+
+def _events(path, engine, **kwargs):
+    loader = WorkflowLoader(path, engine=engine, use_cache=False, **kwargs)
+    return [
+        (w.workflow_id, [(e.event_type, e.timestamp, e.url, e.title, e.data) for e in w.events])
+        for w in loader.load()
+    ]
+
+
+@pytest.mark.skipif(not NATIVE, reason="no native CSV engine installed")
+@pytest.mark.parametrize("engine", NATIVE)
+@pytest.mark.parametrize("line_end", ["\n", "\r\n"])
+@pytest.mark.parametrize("case", sorted(CASES))
+@pytest.mark.parametrize("recover_title_commas", [False, True])
+def test_engine_matches_stdlib(tmp_path, engine, line_end, case, recover_title_commas):
+    path = tmp_path / "export.csv"
+    path.write_bytes(line_end.join([HEADER, *CASES[case]]).encode("utf-8"))
+
+    expected = _events(path, "stdlib", recover_title_commas=recover_title_commas)
+    assert _events(path, engine, recover_title_commas=recover_title_commas) == expected
+
+
+def test_auto_prefers_engines_that_match_stdlib():
+    from automation.csv_engines import resolve_engine
+
+    assert resolve_engine("auto") in ("stdlib", "pyarrow")
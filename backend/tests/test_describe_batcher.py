@@ -0,0 +1,54 @@
+"""Batched plans must share the response cache with individual requests."""
+
+import asyncio
+import json
+
+from automation.describe_batcher import DescribeBatcher
+
+
+def _events(page):
+    return [{"event": "navigation", "url": f"https://{page}.com", "title": page}]
+
+
+def _plan(title):
+    return {"title": title, "description": "d", "steps": [{"id": 1, "label": "Open"}], "required_inputs": []}
+
+
+def test_batched_plans_are_cached_per_item(llm_client):
+    model = llm_client.llm_pro
+    model.replies.append(json.dumps([{"key": "w1", **_plan("A")}, {"key": "w2", **_plan("B")}]))
+    batcher = DescribeBatcher(llm_client, max_wait_ms=50)
+
+    async def describe_both():
+        return await asyncio.gather(
+            batcher.generate_workflow_steps(_events("a")),
+            batcher.generate_workflow_steps(_events("b")),
+        )
+
+    first = asyncio.run(describe_both())
+    assert [plan["title"] for plan in first] == ["A", "B"]
+    assert batcher.batches == 1 and len(model.prompts) == 1
+
+    # Neither the batcher nor the client goes back to the model
+    assert asyncio.run(batcher.generate_workflow_steps(_events("a")))["title"] == "A"
+    assert asyncio.run(llm_client.agenerate_workflow_steps(_events("b")))["title"] == "B"
+    assert len(model.prompts) == 1
+
+
+def test_batcher_answers_from_individual_cache_entries(llm_client):
+    model = llm_client.llm_pro
+    model.replies.append(json.dumps(_plan("A")))
+    assert asyncio.run(llm_client.agenerate_workflow_steps(_events("a")))["title"] == "A"
+
+    # Only the uncached recording is sent, on its own
+    model.replies.append(json.dumps(_plan("B")))
+    batcher = DescribeBatcher(llm_client, max_wait_ms=50)
+
+    async def describe_both():
+        return await asyncio.gather(
+            batcher.generate_workflow_steps(_events("a")),
+            batcher.generate_workflow_steps(_events("b")),
+        )
+
+    assert [plan["title"] for plan in asyncio.run(describe_both())] == ["A", "B"]
+    assert batcher.batches == 0 and len(model.prompts) == 2
@@ -0,0 +1,51 @@
+"""Repairing model JSON, and rejecting plans that were cut off."""
+
+import json
+
+from automation.describe_batcher import _parse_slots
+from automation.json_repair import repair_json
+
+# Every required field comes before the steps, so a cut inside the steps
+# leaves a plan that still has all of them
+PLAN = {
+    "title": "T",
+    "description": "D",
+    "required_inputs": [],
+    "steps": [{"id": 1, "label": "a"}, {"id": 2, "label": "b"}],
+}
+
+
+def test_repairs_fences_trailing_commas_and_literals():
+    text = '```json\n{"a": [1, 2,], "b": True, "c": None,}\n```'
+    assert json.loads(repair_json(text)) == {"a": [1, 2], "b": True, "c": None}
+
+
+def test_closes_truncated_output_only_when_asked():
+    text = '{"steps": [{"label": "a"}, {"label": "'
+    assert json.loads(repair_json(text)) == {"steps": [{"label": "a"}, {"label": ""}]}
+    assert repair_json(text, close_truncated=False) == text
+
+
+def test_truncated_plan_falls_back_and_is_not_cached(llm_client):
+    truncated = json.dumps(PLAN)[:-8]
+    llm_client.llm_pro_json.replies.append(truncated)
+
+    result = llm_client._invoke_workflow_steps("prompt", [], [])
+
+    assert result["description"].endswith("(AI analysis failed)")
+    assert llm_client.cache.stats()["memory_entries"] == 0
+
+
+def test_repairable_plan_is_accepted(llm_client):
+    llm_client.llm_pro_json.replies.append("```json\n" + json.dumps(PLAN) + "\n```")
+
+    result = llm_client._invoke_workflow_steps("prompt", [], [])
+
+    assert [step["label"] for step in result["steps"]] == ["a", "b"]
+
+
+def test_truncated_batch_drops_the_plan_that_was_cut_off():
+    items = [{"key": f"w{n}", **PLAN} for n in (1, 2)]
+    truncated = json.dumps(items)[:-30]
+
+    assert list(_parse_slots(truncated)) == ["w1"]
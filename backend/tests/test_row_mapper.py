@@ -0,0 +1,42 @@
+"""The compiled header plan must map rows the way csv.DictReader saw them."""
+
+import json
+
+from automation.workflow_loader import _RowMapper
+
+
+def test_nests_data_columns_at_any_depth():
+    mapper = _RowMapper(["workflow_id", "event", "timestamp", "data.a", "data.b.c", "data.b.d.e", "viewport.w"])
+    workflow_id, event = mapper(["7", "click", "12", "1", "2", "3", "800"])
+
+    assert workflow_id == "7"
+    assert (event.event_type, event.timestamp, event.url, event.title) == ("click", 12, "", "")
+    assert event.data == {"a": "1", "b": {"c": "2", "d": {"e": "3"}}}
+
+
+def test_scalar_prefix_is_kept_over_nested_keys():
+    mapper = _RowMapper(["data.a", "data.a.b"])
+    assert mapper(["x", "y"])[1].data == {"a": "x"}
+
+
+def test_json_data_column():
+    mapper = _RowMapper(["workflow_id", "data"])
+    assert mapper(["1", json.dumps({"text": "Go"})])[1].data == {"text": "Go"}
+    assert mapper(["1", "not json"])[1].data == {}
+    assert mapper(["1", "[1, 2]"])[1].data == {}
+
+
+def test_ragged_rows_follow_dict_reader():
+    header = ["workflow_id", "event", "", "data.text", "workflow_id"]
+    mapper = _RowMapper(header)
+
+    # Later duplicate columns win and short rows are padded with None
+    assert mapper.workflow_id(["a", "click", "", "t", "b"]) == "b"
+    workflow_id, event = mapper(["a", "click"])
+    assert (workflow_id, event.data) == ("None", {"text": None})
+
+
+def test_recovered_title_commas():
+    mapper = _RowMapper(["workflow_id", "title", "url"], recover_title_commas=True)
+    workflow_id, event = mapper(["1", "Shop", " Cart", "https://a.com"])
+    assert (workflow_id, event.title, event.url) == ("1", "Shop, Cart", "https://a.com")
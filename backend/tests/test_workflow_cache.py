@@ -0,0 +1,43 @@
+"""The binary cache must round-trip what the parser loaded, or not be written."""
+
+from automation.workflow_cache import WorkflowCache
+from automation.workflow_loader import Workflow, WorkflowEvent, WorkflowLoader
+
+CSV = "\n".join([
+    "workflow_id,event,timestamp,url,title,data.text",
+    "1,click,100,https://a.com,Home,Go",
+    "1,input,5000000000000,https://a.com,Home,",
+    "2,click,300,https://b.com,Shop,Buy",
+    "",
+])
+
+
+def _events(workflows):
+    return [
+        (w.workflow_id, [(e.event_type, e.timestamp, e.url, e.title, e.data) for e in w.events])
+        for w in workflows
+    ]
+
+
+def test_cache_round_trip(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(CSV)
+    loader = WorkflowLoader(path, engine="stdlib")
+
+    parsed = loader.load()
+    assert WorkflowCache.path_for(path).exists()
+    assert _events(loader.load()) == _events(parsed)
+    assert _events(loader.load(columnar=True)) == _events(parsed)
+
+
+def test_write_skips_timestamps_outside_int64(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(CSV)
+    cache = WorkflowCache(path)
+    snapshot = cache.snapshot()
+    assert snapshot is not None
+
+    for timestamps in ([10 ** 20], [-(2 ** 63), 2 ** 63 - 1]):
+        workflow = Workflow("1", [WorkflowEvent("click", ts, "https://a.com", "Home") for ts in timestamps])
+        assert cache.write([workflow], snapshot) is False
+        assert cache.read() is None
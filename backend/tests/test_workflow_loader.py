@@ -0,0 +1,149 @@
+"""Every WorkflowLoader path must load the same workflows as load()."""
+
+import json
+
+import pytest
+
+from automation.json_loader import JsonWorkflowLoader
+from automation.workflow_loader import WorkflowLoader
+
+INT64_MAX = 2 ** 63 - 1
+INT64_MIN = -(2 ** 63)
+
+# Ungrouped, with timestamps beyond int64 in both directions
+CSV = "\n".join([
+    "workflow_id,event,timestamp,url,title",
+    "1,click,1e20,https://a.com,Home",
+    "2,click,5,https://b.com,Shop",
+    "1,click,7,https://a.com,Home",
+    "2,input,-99999999999999999999,https://b.com,Shop",
+    "",
+])
+EXPECTED = [("1", [7, INT64_MAX]), ("2", [INT64_MIN, 5])]
+
+
+def _timestamps(workflows):
+    return [(w.workflow_id, [e.timestamp for e in w.events]) for w in workflows]
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(CSV)
+    return path
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_out_of_range_timestamps_are_clamped(export, columnar, use_cache):
+    loader = WorkflowLoader(export, engine="stdlib", use_cache=use_cache)
+    assert _timestamps(loader.load(columnar=columnar)) == EXPECTED
+    # Second load reads the cache when one was written
+    assert _timestamps(loader.load(columnar=columnar)) == EXPECTED
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_load_many_clamps_timestamps(export, columnar):
+    result = WorkflowLoader.load_many([export], workers=1, columnar=columnar)
+    assert _timestamps(result[export]) == EXPECTED
+
+
+def test_json_loader_clamps_timestamps(tmp_path):
+    path = tmp_path / "export.ndjson"
+    path.write_text("\n".join(json.dumps(obj) for obj in [
+        {"workflow_id": "1", "event": "click", "timestamp": 10 ** 20},
+        {"workflow_id": "1", "event": "click", "timestamp": 7},
+    ]))
+    assert _timestamps(JsonWorkflowLoader(path).load(columnar=True)) == [("1", [7, INT64_MAX])]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 100_000])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_external_sort_matches_load(export, chunk_rows, columnar):
+    loader = WorkflowLoader(export, engine="stdlib", use_cache=False)
+    workflows = list(loader.iter_workflows(grouped=False, chunk_rows=chunk_rows, columnar=columnar))
+    assert _timestamps(workflows) == EXPECTED
+
+
+@pytest.mark.parametrize("timestamp", [0, -1, 7, INT64_MIN, INT64_MAX, 10 ** 20, -(10 ** 20)])
+def test_spill_line_round_trip(timestamp):
+    from automation.workflow_loader import WorkflowEvent, _decode_spill_line, _encode_spill_line
+
+    event = WorkflowEvent("input", timestamp, "https://a.com", "Line\nbreak", {"text": "x, \"y\""})
+    line = _encode_spill_line(3, 42, "wf", event)
+    assert line.count("\n") == 1
+    assert _decode_spill_line(line) == ("wf", event)
+
+
+def test_spill_lines_sort_by_workflow_timestamp_and_row():
+    from automation.workflow_loader import WorkflowEvent, _encode_spill_line
+
+    keys = [(0, -(10 ** 20), 5), (0, -1, 9), (0, 0, 1), (0, 0, 2), (0, 10 ** 20, 0), (1, INT64_MIN, 3)]
+    lines = [
+        _encode_spill_line(order, seq, "wf", WorkflowEvent("click", ts, "", ""))
+        for order, ts, seq in keys
+    ]
+    assert sorted(lines) == lines
+
+
+def _events(workflows):
+    return [
+        (w.workflow_id, [(e.event_type, e.timestamp, e.url, e.title, e.data) for e in w.events])
+        for w in workflows
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_load_many_matches_load(tmp_path, workers, columnar):
+    rows = [
+        f'{i % 7},{"click" if i % 3 else "input"},{(i * 37) % 50},https://a.com/{i % 5},"Title, {i % 4}",x{i % 6}'
+        for i in range(400)
+    ]
+    paths = []
+    for name in ("a.csv", "b.csv"):
+        path = tmp_path / name
+        path.write_text("\n".join(["workflow_id,event,timestamp,url,title,data.text", *rows, ""]))
+        paths.append(path)
+
+    result = WorkflowLoader.load_many(paths, workers=workers, chunk_bytes=2048, columnar=columnar)
+    for path in paths:
+        expected = WorkflowLoader(path, engine="stdlib", use_cache=False).load()
+        assert _events(result[path]) == _events(expected)
+
+
+@pytest.mark.parametrize("document, expected", [
+    ({"workflow_id": "7", "events": [{"event": "click", "timestamp": 2}, {"event": "input", "timestamp": 1}]},
+     [("7", [1, 2])]),
+    ({"id": 8, "events": [{"event": "click", "timestamp": 1}]}, [("8", [1])]),
+    ({"events": [{"workflow_id": "1", "timestamp": 1}, {"workflow_id": "2", "timestamp": 2}]},
+     [("1", [1]), ("2", [2])]),
+    ({"workflows": [{"workflow_id": "3", "events": [{"timestamp": 1}]}]}, [("3", [1])]),
+    ({"workflow_id": "4", "event": "click", "timestamp": 5}, [("4", [5])]),
+])
+def test_json_document_layouts(tmp_path, document, expected):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(document))
+    assert _timestamps(JsonWorkflowLoader(path).load()) == expected
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_single_builds_index_and_matches_load(tmp_path, use_cache):
+    from automation.workflow_index import WorkflowIndex
+
+    path = tmp_path / "export.csv"
+    # Duplicate workflow_id column: the last one wins, as in csv.DictReader
+    path.write_bytes(b"\r\n".join([
+        b"workflow_id,event,timestamp,title,workflow_id",
+        b'x,click,2,"Two\r\nlines",1',
+        b'x,input,1,"CR\rinside",2',
+        b'y,click,3,Plain,1',
+        b"",
+    ]))
+    expected = {w.workflow_id: w for w in WorkflowLoader(path, engine="stdlib", use_cache=False).load()}
+
+    loader = WorkflowLoader(path, engine="stdlib", use_cache=use_cache)
+    for workflow_id in ("1", "2", None):
+        workflow = loader.load_single(workflow_id)
+        assert _events([workflow]) == _events([expected[workflow_id or "1"]])
+    assert WorkflowIndex.load(path) is not None